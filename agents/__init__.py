@@ -1,4 +1,4 @@
-from typing import TypedDict, List, Optional
+from typing import TypedDict, List, Optional, Dict, Any
 from models import PatientInfo, PatientLookupResult, AppointmentSlot, AppointmentBooking, InsuranceInfo
 
 class BookingState(TypedDict):
@@ -11,6 +11,7 @@ class BookingState(TypedDict):
     
     # Validated Pydantic Models
     patient_info: Optional[PatientInfo]
+    patient_info_dict: Optional[Dict[str, Any]]
     lookup_result: Optional[PatientLookupResult]
     available_slots: Optional[List[AppointmentSlot]]
     selected_slot: Optional[AppointmentSlot]
@@ -38,6 +39,7 @@ def create_initial_state() -> BookingState:
         conversation_history=[],
         errors=[],
         patient_info=None,
+        patient_info_dict=None,
         lookup_result=None,
         available_slots=None,
         selected_slot=None,
@@ -3,12 +3,15 @@ import os
 from typing import Dict, Any, Optional, List, Tuple
 from pathlib import Path
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
 import json
 
 # Safe path handling
 try:
     current_dir = Path(__file__).parent
-    sys.path.append(str(current_dir.parent))
+    project_root = str(current_dir.parent)
+    if project_root not in sys.path:
+        sys.path.append(project_root)
 except NameError:
     sys.path.append('..')
 
@@ -80,18 +83,21 @@ class ConfirmationAgent:
                 'group_number': insurance_info.get('group_number', ''),
             }
             
-            # Send confirmation email
-            confirmation_email_sent = self._send_confirmation_email(
-                patient_info['email'],
-                patient_info['patient_name'],
-                confirmation_record
-            )
-            
-            # Send confirmation SMS
-            confirmation_sms_sent = self._send_confirmation_sms(
-                patient_info['phone'],
-                confirmation_record
-            )
+            # Send confirmation email and SMS concurrently - both are network-bound
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                email_future = executor.submit(
+                    self._send_confirmation_email,
+                    patient_info['email'],
+                    patient_info['patient_name'],
+                    confirmation_record
+                )
+                sms_future = executor.submit(
+                    self._send_confirmation_sms,
+                    patient_info['phone'],
+                    confirmation_record
+                )
+                confirmation_email_sent = email_future.result()
+                confirmation_sms_sent = sms_future.result()
             
             # Update confirmation record
             confirmation_record['email_sent'] = confirmation_email_sent
@@ -187,8 +193,8 @@ class ConfirmationAgent:
             if export_success:
                 # ✅ FIX: Read ALL appointments from Excel file, not in-memory list
                 if os.path.exists(excel_service.appointments_file):
-                    import pandas as pd
-                    appointments_df = pd.read_excel(excel_service.appointments_file)
+                    from utils.data_loader import load_excel
+                    appointments_df = load_excel(excel_service.appointments_file)
                     all_appointments = appointments_df.to_dict('records')
                 else:
                     all_appointments = [confirmation_record]
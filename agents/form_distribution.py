@@ -7,7 +7,9 @@ from datetime import datetime
 # Safe path handling
 try:
     current_dir = Path(__file__).parent
-    sys.path.append(str(current_dir.parent))
+    project_root = str(current_dir.parent)
+    if project_root not in sys.path:
+        sys.path.append(project_root)
 except NameError:
     sys.path.append('..')
 
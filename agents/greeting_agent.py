@@ -1,20 +1,23 @@
 import sys
 import os
 import re
-from typing import Dict, Any, Optional, Tuple
+from typing import Dict, Any, Optional, Tuple, Callable, List
 from pathlib import Path
 from datetime import datetime
-import json
 
 # Safe path handling
 try:
     current_dir = Path(__file__).parent
-    sys.path.append(str(current_dir.parent))
+    project_root = str(current_dir.parent)
+    if project_root not in sys.path:
+        sys.path.append(project_root)
 except NameError:
     sys.path.append('..')
 
 from models import PatientInfo
 from agents import BookingState
+from utils.llm_cache import LLMResponseCache, llm_cache_enabled
+from pydantic_core import from_json
 from langchain_groq import ChatGroq
 from langchain.schema import HumanMessage, SystemMessage
 from dotenv import load_dotenv
@@ -23,14 +26,21 @@ load_dotenv()
 class GreetingAgent:
     """LLM-powered greeting agent with step-by-step data collection"""
     
-    def __init__(self):
+    def __init__(self, use_cache: Optional[bool] = None):
         self.llm = ChatGroq(
             groq_api_key=os.getenv("GROQ_API_KEY"),
             model_name=os.getenv("GROQ_MODEL", "llama3-8b-8192")
         )
+        # Replayed prompts (e.g. repeated demos) can be answered from disk. Off unless
+        # LLM_CACHE_ENABLED is set, since prompts and completions hold patient details
+        if use_cache is None:
+            use_cache = llm_cache_enabled()
+        self.llm_cache = LLMResponseCache() if use_cache else None
         self.collected_data = {}
         self.conversation_history = []
         self.current_field = 0
+        # Optional sink for streamed LLM tokens (set by the app while a turn is in flight)
+        self.token_callback: Optional[Callable[[str], None]] = None
         self.fields = [
             'patient_name',
             'date_of_birth', 
@@ -87,9 +97,9 @@ class GreetingAgent:
         
         current_field = self.fields[self.current_field]
         
-        system_prompt = f"""You are a medical scheduling assistant. Extract and validate the {current_field} from user input.
-
-CURRENT FIELD: {current_field}
+        # Static system prompt so every turn shares a cacheable prompt prefix;
+        # the per-turn field and input go in the human message
+        system_prompt = """You are a medical scheduling assistant. Extract and validate the requested field from user input.
 
 VALIDATION RULES:
 - patient_name: Must have first AND last name, normalize to Title Case
@@ -100,27 +110,26 @@ VALIDATION RULES:
 - location: Must be exactly one of ["Gachibowli", "Jubliee Hills", "Banjara Hills"]
 
 RETURN FORMAT:
-If valid: {{"field_name": "validated_value"}}
-If invalid: {{}}
+If valid: {"field_name": "validated_value"}
+If invalid: {}
 
 EXAMPLES:
-Input: "john smith" for patient_name → {{"patient_name": "John Smith"}}
-Input: "july 4th 1990" for date_of_birth → {{"date_of_birth": "07/04/1990"}}  
-Input: "dr naveen" for preferred_doctor → {{"preferred_doctor": "Dr. Naveen"}}
-Input: "john" for patient_name → {{}} (missing last name)
+Input: "john smith" for patient_name → {"patient_name": "John Smith"}
+Input: "july 4th 1990" for date_of_birth → {"date_of_birth": "07/04/1990"}  
+Input: "dr naveen" for preferred_doctor → {"preferred_doctor": "Dr. Naveen"}
+Input: "john" for patient_name → {} (missing last name)
 """
         
         try:
             messages = [
                 SystemMessage(content=system_prompt),
-                HumanMessage(content=f"Extract {current_field} from: {user_input}")
+                HumanMessage(content=f"CURRENT FIELD: {current_field}\nExtract {current_field} from: {user_input}")
             ]
             
-            response = self.llm.invoke(messages)
-            response_text = response.content.strip()
+            response_text = self._invoke_llm(messages).strip()
             
             if response_text.startswith('{') and response_text.endswith('}'):
-                extracted = json.loads(response_text)
+                extracted = from_json(response_text)
                 
                 # Validate that we got the expected field
                 if current_field in extracted and extracted[current_field]:
@@ -131,6 +140,46 @@ Input: "john" for patient_name → {{}} (missing last name)
         
             return None
     
+    def _invoke_llm(self, messages: List) -> str:
+        """Invoke the LLM, answering from the response cache when possible"""
+        cache_key = self._cache_key(messages)
+        if cache_key:
+            cached = self.llm_cache.get(cache_key)
+            if cached is not None:
+                return cached
+        
+        content = self.llm.invoke(messages).content
+        if cache_key:
+            self.llm_cache.set(cache_key, content)
+        return content
+    
+    def _generate_text(self, messages: List) -> str:
+        """Generate user-facing text, streaming tokens to token_callback when set"""
+        if self.token_callback is None:
+            return self._invoke_llm(messages).strip()
+        
+        cache_key = self._cache_key(messages)
+        cached = self.llm_cache.get(cache_key) if cache_key else None
+        if cached is not None:
+            self.token_callback(cached)
+            return cached.strip()
+        
+        parts = []
+        for chunk in self.llm.stream(messages):
+            if chunk.content:
+                parts.append(chunk.content)
+                self.token_callback(chunk.content)
+        content = ''.join(parts)
+        if cache_key:
+            self.llm_cache.set(cache_key, content)
+        return content.strip()
+    
+    def _cache_key(self, messages: List) -> Optional[str]:
+        """Cache key for a prompt, or None when caching is disabled"""
+        if self.llm_cache is None:
+            return None
+        return LLMResponseCache.make_key(self.llm.model_name, messages)
+    
     def _advance_to_next_field(self):
         """Move to the next field that hasn't been collected"""
         self.current_field += 1
@@ -156,8 +205,7 @@ Make it natural and encouraging. Examples:
 Keep it short (1 line) and positive."""
         
         try:
-            response = self.llm.invoke([SystemMessage(content=system_prompt)])
-            return f"{response.content.strip()}"
+            return self._generate_text([SystemMessage(content=system_prompt)])
         except:
             return f"Got it! {field_name.replace('_', ' ').title()}: {field_value}"
     
@@ -183,7 +231,7 @@ Keep it short (1 line) and positive."""
     def _generate_error_message_with_llm(self, user_input: str, field_name: str) -> str:
         """Generate helpful error message using LLM"""
         
-        system_prompt = f"""The user provided "{user_input}" for {field_name} but it's not valid.
+        system_prompt = """The user provided an invalid value for one of the fields below.
 
 Generate a helpful, empathetic error message explaining what's wrong and how to fix it.
 
@@ -198,8 +246,10 @@ FIELD REQUIREMENTS:
 Be encouraging and specific about what's needed."""
         
         try:
-            response = self.llm.invoke([SystemMessage(content=system_prompt)])
-            return f"{response.content.strip()}"
+            return self._generate_text([
+                SystemMessage(content=system_prompt),
+                HumanMessage(content=f'The user provided "{user_input}" for {field_name}.')
+            ])
         except:
             return f"I couldn't validate that {field_name.replace('_', ' ')}. Could you please try again?"
     
@@ -218,8 +268,7 @@ Be encouraging and specific about what's needed."""
         Make it warm and professional."""
         
         try:
-            response = self.llm.invoke([SystemMessage(content=system_prompt)])
-            return f"🎉 {response.content.strip()}"
+            return f"🎉 {self._generate_text([SystemMessage(content=system_prompt)])}"
         except:
             # Fallback completion message
             return (
@@ -1,19 +1,22 @@
 import sys
 import os
 import pandas as pd
-from typing import Dict, Any, Optional, Tuple
+from typing import Dict, Any, Optional, Tuple, List
 from datetime import datetime
 from pathlib import Path
 
 # Safe path handling
 try:
     current_dir = Path(__file__).parent
-    sys.path.append(str(current_dir.parent))
+    project_root = str(current_dir.parent)
+    if project_root not in sys.path:
+        sys.path.append(project_root)
 except NameError:
     # Running in interactive environment
     sys.path.append('..')
 
 from models import PatientLookupResult
+from utils.data_loader import load_csv
 
 class LookupAgent:
     """Assignment-accurate lookup agent that searches EMR and detects new vs returning patients"""
@@ -21,6 +24,8 @@ class LookupAgent:
     def __init__(self, patients_csv_path: str = "data/patients.csv"):
         self.patients_csv_path = patients_csv_path
         self.patients_df = None
+        self._search_index = {}
+        self._search_index_source = None
         self.load_patient_database()
     
     def load_patient_database(self):
@@ -28,7 +33,7 @@ class LookupAgent:
         try:
             # Try to load the actual CSV file
             if os.path.exists(self.patients_csv_path):
-                self.patients_df = pd.read_csv(self.patients_csv_path)
+                self.patients_df = load_csv(self.patients_csv_path)
                 print(f"Loaded {len(self.patients_df)} patients from database")
             else:
                 # If CSV doesn't exist, try to find it in different locations
@@ -41,7 +46,7 @@ class LookupAgent:
                 
                 for path in possible_paths:
                     if os.path.exists(path):
-                        self.patients_df = pd.read_csv(path)
+                        self.patients_df = load_csv(path)
                         print(f"Loaded {len(self.patients_df)} patients from {path}")
                         break
                 else:
@@ -76,12 +81,10 @@ class LookupAgent:
         try:
             normalized_dob = self._normalize_dob_for_search(dob)
             
-            for _, row in self.patients_df.iterrows():
-                db_name = f"{row['first_name']} {row['last_name']}".lower()
-                db_dob = self._normalize_dob_for_search(str(row['dob']))
-                
-                if patient_name in db_name and normalized_dob == db_dob:
-                    return row.to_dict()
+            # Only patients sharing the DOB are scanned, in file order
+            for db_name, position in self._patient_search_index().get(normalized_dob, ()):
+                if patient_name in db_name:
+                    return self.patients_df.iloc[position].to_dict()
             
             return None
             
@@ -89,6 +92,19 @@ class LookupAgent:
             print(f"Error searching patient database: {e}")
             return None
     
+    def _patient_search_index(self) -> Dict[str, List[Tuple[str, int]]]:
+        """Lowercased full names by normalized DOB, rebuilt whenever patients_df is replaced"""
+        if self._search_index_source is not self.patients_df:
+            names = (
+                self.patients_df['first_name'].astype(str) + ' ' + self.patients_df['last_name'].astype(str)
+            ).str.lower()
+            index = {}
+            for position, (db_name, db_dob) in enumerate(zip(names, self.patients_df['dob'])):
+                index.setdefault(self._normalize_dob_for_search(str(db_dob)), []).append((db_name, position))
+            self._search_index = index
+            self._search_index_source = self.patients_df
+        return self._search_index
+    
     def _normalize_dob_for_search(self, dob: str) -> str:
         """Normalize DOB format for comparison"""
         try:
@@ -185,7 +201,8 @@ class LookupAgent:
         # Save new patient to CSV
         self._save_new_patient_to_csv(new_patient_record)
         
-        lookup_result = PatientLookupResult(
+        # Fixed, known-valid values for a new patient - no validation needed
+        lookup_result = PatientLookupResult.model_construct(
             patient_id=new_patient_id,
             patient_type="new",
             appointment_duration=60,
@@ -212,7 +229,7 @@ class LookupAgent:
             
             # Read existing CSV
             try:
-                df = pd.read_csv(self.patients_csv_path)
+                df = load_csv(self.patients_csv_path)
             except FileNotFoundError:
                 # Create new DataFrame with proper columns if file doesn't exist
                 df = pd.DataFrame(columns=[
@@ -294,8 +311,8 @@ class LookupAgent:
         except Exception as e:
             print(f" Error updating patient insurance info: {e}")
     
-    def mark_patient_as_returning(self, patient_id: str):
-        """Mark a patient as returning after their first completed appointment"""
+    def mark_patient_as_returning(self, patient_id: str) -> bool:
+        """Mark a patient as returning after their first completed appointment; True on success"""
         try:
             import pandas as pd
             
@@ -308,11 +325,14 @@ class LookupAgent:
                 # Save updated dataframe to CSV
                 self.patients_df.to_csv(self.patients_csv_path, index=False)
                 print(f" Marked patient {patient_id} as returning")
+                return True
             else:
                 print(f" Patient {patient_id} not found for status update")
+                return False
                 
         except Exception as e:
             print(f" Error marking patient as returning: {e}")
+            return False
     
     def get_patient_summary(self, lookup_result: PatientLookupResult) -> str:
         """Get a summary of the patient lookup result"""
@@ -2,19 +2,43 @@ import sys
 import os
 from typing import Dict, Any, Optional, List, Tuple
 from datetime import datetime, timedelta
+from dataclasses import dataclass
 from pathlib import Path
 import json
 
 # Safe path handling
 try:
     current_dir = Path(__file__).parent
-    sys.path.append(str(current_dir.parent))
+    project_root = str(current_dir.parent)
+    if project_root not in sys.path:
+        sys.path.append(project_root)
 except NameError:
     sys.path.append('..')
 
 from models import AppointmentBooking
 from utils.notification import MockNotificationService
 
+@dataclass(slots=True, frozen=True)
+class ReminderPatient:
+    """Patient contact details a reminder needs"""
+    patient_name: str
+    email: str
+    phone: str
+
+@dataclass(slots=True, frozen=True)
+class ReminderSlot:
+    """Appointment slot details a reminder needs"""
+    date: str
+    time: str
+    doctor: str
+    location: str
+
+@dataclass(slots=True, frozen=True)
+class ReminderAppointment:
+    """Lightweight appointment shape accepted by ReminderAgent"""
+    patient_info: ReminderPatient
+    appointment_slot: ReminderSlot
+
 class ReminderAgent:
     """Assignment-accurate reminder system with 3 automated reminders and actions"""
     
@@ -312,21 +336,19 @@ def test_reminder_agent():
     print("🧪 Testing Reminder Agent with Mock Notifications...\n")
     
     # Create a mock appointment for testing
-    class MockAppointment:
-        def __init__(self):
-            self.patient_info = type('obj', (object,), {
-                'patient_name': 'John Smith',
-                'email': 'john.smith@fakeemail.com',
-                'phone': '(555) 123-4567'
-            })()
-            self.appointment_slot = type('obj', (object,), {
-                'date': '2025-01-15',
-                'time': '14:00',
-                'doctor': 'Dr. Naveen',
-                'location': 'Gachibowli'
-            })()
-    
-    appointment = MockAppointment()
+    appointment = ReminderAppointment(
+        ReminderPatient(
+            patient_name='John Smith',
+            email='john.smith@fakeemail.com',
+            phone='(555) 123-4567'
+        ),
+        ReminderSlot(
+            date='2025-01-15',
+            time='14:00',
+            doctor='Dr. Naveen',
+            location='Gachibowli'
+        )
+    )
     agent = ReminderAgent(mock_mode=True)
     
     print("=== Testing Reminder Scheduling ===")
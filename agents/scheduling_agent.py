@@ -1,6 +1,10 @@
 import sys
 import os
+import csv
 import pandas as pd
+from contextlib import contextmanager
+from time import sleep, time as current_time
+from uuid import uuid4
 from typing import Dict, Any, Optional, Tuple, List
 from datetime import datetime, timedelta
 from pathlib import Path
@@ -8,18 +12,84 @@ from pathlib import Path
 # Safe path handling
 try:
     current_dir = Path(__file__).parent
-    sys.path.append(str(current_dir.parent))
+    project_root = str(current_dir.parent)
+    if project_root not in sys.path:
+        sys.path.append(project_root)
 except NameError:
     sys.path.append('..')
 
-from models import AppointmentSlot, PatientLookupResult
+from pydantic import ValidationError
+from models import AppointmentSlot, PatientLookupResult, APPOINTMENT_SLOTS_ADAPTER
+from utils.data_loader import load_excel, save_excel
+
+# Bookings are appended to a small CSV log next to the schedule workbook and
+# folded back into the .xlsx once this many have accumulated
+BOOKING_LOG_COLUMNS = ['doctor', 'location', 'date', 'time', 'status']
+BOOKING_LOG_COMPACT_AT = 50
+# A log lock file older than this many seconds, whose owner is gone, is treated as abandoned
+BOOKING_LOG_LOCK_TIMEOUT = 10
+
+def _read_lock_token(lock_path: str) -> Optional[str]:
+    """Contents ("<pid> <token>") of a lock file, or None if it is gone"""
+    try:
+        with open(lock_path) as f:
+            return f.read()
+    except FileNotFoundError:
+        return None
+
+def _lock_owner_alive(token: str) -> bool:
+    """Whether the process that wrote a lock token is still running"""
+    try:
+        pid = int(token.split()[0])
+    except (ValueError, IndexError):
+        return False
+    if os.name != "posix":
+        # os.kill(pid, 0) would terminate the process on Windows; rely on the file age there
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+def _break_stale_lock(lock_path: str) -> None:
+    """Remove lock_path if its own age and owner show it was abandoned"""
+    token = _read_lock_token(lock_path)
+    try:
+        age = current_time() - os.stat(lock_path).st_mtime
+    except FileNotFoundError:
+        return
+    if token is None or age < BOOKING_LOG_LOCK_TIMEOUT or _lock_owner_alive(token):
+        return
+    
+    # Move it aside first and check it is still the lock judged stale: another waiter
+    # may have broken it and a new holder created a fresh lock in the meantime
+    tombstone = f"{lock_path}.{uuid4().hex}.stale"
+    try:
+        os.replace(lock_path, tombstone)
+    except FileNotFoundError:
+        return
+    if _read_lock_token(tombstone) != token:
+        try:
+            # Put the live lock back unless yet another holder already took the path
+            os.link(tombstone, lock_path)
+        except OSError:
+            pass
+    else:
+        print(f" Breaking stale booking log lock {lock_path}")
+    os.remove(tombstone)
 
 class SchedulingAgent:
     """Assignment-accurate scheduling agent for appointment slot management"""
     
     def __init__(self, schedule_excel_path: str = "data/doctors_schedule.xlsx"):
         self.schedule_excel_path = schedule_excel_path
+        self.booking_log_path = os.path.splitext(schedule_excel_path)[0] + "_bookings.csv"
         self.schedule_df = None
+        self._slot_rows = {}
+        self._doctor_location_rows = {}
         self.load_doctor_schedule()
     
     def load_doctor_schedule(self):
@@ -35,7 +105,7 @@ class SchedulingAgent:
             
             for path in possible_paths:
                 if os.path.exists(path):
-                    self.schedule_df = pd.read_excel(path)
+                    self.schedule_df = self._downcast_schedule(load_excel(path, parquet_cache=True))
                     print(f"Loaded doctor schedule from {path}")
                     break
             else:
@@ -45,6 +115,142 @@ class SchedulingAgent:
         except Exception as e:
             print(f" Error loading doctor schedule: {e}")
             self.schedule_df = pd.DataFrame()
+        
+        self._build_slot_index()
+        if not self.schedule_df.empty and os.path.exists(self.booking_log_path):
+            with self._booking_log_lock():
+                self._apply_booking_log()
+    
+    @contextmanager
+    def _booking_log_lock(self):
+        """Serialize booking-log appends and compaction across agents and processes"""
+        lock_path = self.booking_log_path + ".lock"
+        token = f"{os.getpid()} {uuid4().hex}"
+        while True:
+            try:
+                # O_EXCL creation is atomic on every platform, unlike fcntl/msvcrt locks
+                fd = os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+                break
+            except FileExistsError:
+                _break_stale_lock(lock_path)
+                sleep(0.01)
+        try:
+            os.write(fd, token.encode())
+        finally:
+            os.close(fd)
+        try:
+            yield
+        finally:
+            # Only release the lock if it is still ours
+            if _read_lock_token(lock_path) == token:
+                os.remove(lock_path)
+    
+    def _apply_booking_log(self):
+        """Replay bookings logged since the workbook was last written (log lock held)"""
+        if self.schedule_df.empty or not os.path.exists(self.booking_log_path):
+            return
+        
+        try:
+            unmatched = 0
+            with open(self.booking_log_path, newline='') as f:
+                for booking in csv.DictReader(f):
+                    if not self._mark_slot_booked(
+                        booking['doctor'], booking['location'], booking['date'],
+                        booking['time'], booking['status']
+                    ):
+                        unmatched += 1
+            if unmatched:
+                # e.g. the schedule was regenerated after these bookings were logged
+                print(f" Skipped {unmatched} logged booking(s) for slots not in the schedule")
+        except Exception as e:
+            print(f" Error applying schedule booking log: {e}")
+    
+    def _append_booking_log(self, bookings: List[List[str]]):
+        """Append booked slots to the log, compacting into the workbook when it grows"""
+        with self._booking_log_lock():
+            is_new = not os.path.exists(self.booking_log_path)
+            with open(self.booking_log_path, 'a', newline='') as f:
+                writer = csv.writer(f)
+                if is_new:
+                    writer.writerow(BOOKING_LOG_COLUMNS)
+                writer.writerows(bookings)
+            
+            with open(self.booking_log_path) as f:
+                logged = sum(1 for _ in f) - 1
+            if logged >= BOOKING_LOG_COMPACT_AT:
+                self._compact_booking_log_locked()
+    
+    def compact_booking_log(self):
+        """Write the in-memory schedule to Excel and clear the booking log"""
+        with self._booking_log_lock():
+            self._compact_booking_log_locked()
+    
+    def _compact_booking_log_locked(self):
+        """Fold the booking log into the workbook (log lock held)"""
+        # Start from the workbook on disk, not this agent's frame: another agent may
+        # have compacted its bookings since this one loaded, leaving them only in the file
+        if os.path.exists(self.schedule_excel_path):
+            self.schedule_df = self._downcast_schedule(load_excel(self.schedule_excel_path, parquet_cache=True))
+            self._build_slot_index()
+        self._apply_booking_log()
+        
+        # Write a temp workbook and swap it in, so a crash never leaves a half-written
+        # schedule; until the log is removed, replaying it again is harmless
+        tmp_path = f"{os.path.splitext(self.schedule_excel_path)[0]}.{os.getpid()}.tmp.xlsx"
+        save_excel(self.schedule_df.drop(columns='datetime', errors='ignore'), tmp_path)
+        os.replace(tmp_path, self.schedule_excel_path)
+        if os.path.exists(self.booking_log_path):
+            os.remove(self.booking_log_path)
+        print(f" Compacted schedule booking log into {self.schedule_excel_path}")
+    
+    @staticmethod
+    def _downcast_schedule(df: pd.DataFrame) -> pd.DataFrame:
+        """Store the low-cardinality schedule columns in compact dtypes"""
+        if 'date' in df.columns and 'time' in df.columns:
+            # Parse slot timestamps once here instead of on every search
+            df['datetime'] = pd.to_datetime(df['date'].astype(str) + ' ' + df['time'].astype(str))
+        for column in ('doctor', 'location', 'date', 'time'):
+            if column in df.columns:
+                df[column] = df[column].astype('category')
+        if 'available' in df.columns:
+            df['available'] = df['available'].astype(bool)
+        if 'duration_available' in df.columns:
+            df['duration_available'] = df['duration_available'].astype('int8')
+        return df
+    
+    def _build_slot_index(self):
+        """Index schedule rows by (doctor, location) and by exact slot"""
+        if self.schedule_df.empty:
+            self._slot_rows = {}
+            self._doctor_location_rows = {}
+            return
+        
+        self._slot_rows = dict(zip(
+            zip(self.schedule_df['doctor'], self.schedule_df['location'],
+                self.schedule_df['date'], self.schedule_df['time']),
+            self.schedule_df.index
+        ))
+        self._doctor_location_rows = self.schedule_df.groupby(['doctor', 'location'], observed=True).groups
+    
+    def _doctor_location_slots(self, doctor: str, location: str) -> pd.DataFrame:
+        """Schedule rows for one doctor at one location"""
+        rows = self._doctor_location_rows.get((doctor, location))
+        if rows is None:
+            return self.schedule_df.iloc[0:0]
+        return self.schedule_df.loc[rows]
+    
+    def find_slot_row(self, slot: AppointmentSlot) -> Optional[pd.Series]:
+        """Look up a slot's schedule row through the (doctor, location, date, time) index"""
+        row = self._slot_rows.get((slot.doctor, slot.location, slot.date, slot.time))
+        return None if row is None else self.schedule_df.loc[row]
+    
+    def _mark_slot_booked(self, doctor: str, location: str, date: str, time: str, status: str) -> bool:
+        """Mark a single slot as unavailable in the in-memory schedule; False if it doesn't exist"""
+        row = self._slot_rows.get((doctor, location, date, time))
+        if row is None:
+            return False
+        self.schedule_df.loc[row, ['available', 'duration_available', 'status']] = [False, 0, status]
+        return True
     
     def find_available_slots(self, 
                             patient_data: Dict[str, Any], 
@@ -92,70 +298,50 @@ class SchedulingAgent:
         try:
             if duration == 60:  # New patient needs 2 consecutive slots
                 # Find slots where current slot + next slot are both available
-                available_slots = self._find_consecutive_slots(doctor, location)
+                available_df = self._find_consecutive_slots(doctor, location)
             else:  # Returning patient needs 1 slot
-                filtered_df = self.schedule_df[
-                    (self.schedule_df['doctor'] == doctor) &
-                    (self.schedule_df['location'] == location) &
-                    (self.schedule_df['available'] == True) &
-                    (self.schedule_df['duration_available'] >= duration)
-                ].copy()
-                available_slots = filtered_df.to_dict('records')
-            
-            # Sort by date and time
-            if available_slots:
-                df = pd.DataFrame(available_slots)
-                df['datetime'] = pd.to_datetime(df['date'] + ' ' + df['time'])
-                df = df.sort_values('datetime')
-                available_slots = df.head(7).to_dict('records')
+                slots_df = self._doctor_location_slots(doctor, location)
+                available_df = slots_df[
+                    (slots_df['available'] == True) &
+                    (slots_df['duration_available'] >= duration)
+                ]
             
-            return available_slots
+            # Sort by date and time, staying in the frame until the final 7 rows
+            return available_df.sort_values('datetime').head(7).to_dict('records')
             
         except Exception as e:
             print(f"Error filtering available slots: {e}")
             return []
 
-    def _find_consecutive_slots(self, doctor: str, location: str) -> List[Dict]:
+    def _find_consecutive_slots(self, doctor: str, location: str) -> pd.DataFrame:
         """Find consecutive 30-minute slots for new patients (60 minutes total)"""
-        consecutive_slots = []
-        
         try:
             # Get all available slots for this doctor/location
-            doctor_slots = self.schedule_df[
-                (self.schedule_df['doctor'] == doctor) &
-                (self.schedule_df['location'] == location) &
-                (self.schedule_df['available'] == True) &
-                (self.schedule_df['duration_available'] >= 30)
-            ].copy()
-            
-            if doctor_slots.empty:
-                return consecutive_slots
+            slots_df = self._doctor_location_slots(doctor, location)
+            doctor_slots = slots_df[
+                (slots_df['available'] == True) &
+                (slots_df['duration_available'] >= 30)
+            ]
             
             # Sort by date and time
-            doctor_slots['datetime'] = pd.to_datetime(doctor_slots['date'] + ' ' + doctor_slots['time'])
             doctor_slots = doctor_slots.sort_values('datetime')
             
-            # Check for consecutive slots
-            for i in range(len(doctor_slots) - 1):
-                current_slot = doctor_slots.iloc[i]
-                next_slot = doctor_slots.iloc[i + 1]
-                
-                # Check if slots are consecutive (30 minutes apart)
-                current_time = pd.to_datetime(current_slot['date'] + ' ' + current_slot['time'])
-                next_time = pd.to_datetime(next_slot['date'] + ' ' + next_slot['time'])
-                
-                if (next_time - current_time).total_seconds() == 1800:  # 30 minutes = 1800 seconds
-                    # Found consecutive slots - add the first one
-                    consecutive_slots.append(current_slot.to_dict())
-            
-            return consecutive_slots
+            # Keep the first slot of every pair that is exactly 30 minutes apart
+            gap_to_next = doctor_slots['datetime'].shift(-1) - doctor_slots['datetime']
+            return doctor_slots[gap_to_next == pd.Timedelta(minutes=30)]
             
         except Exception as e:
             print(f"Error finding consecutive slots: {e}")
-            return []
+            return pd.DataFrame(columns=['datetime'])
     
     def _create_appointment_slots(self, available_slots: List[Dict]) -> List[AppointmentSlot]:
         """Convert filtered data to AppointmentSlot objects"""
+        # Validate the whole batch at once; fall back to row-by-row only if a row is bad
+        try:
+            return APPOINTMENT_SLOTS_ADAPTER.validate_python(available_slots)
+        except ValidationError:
+            pass
+        
         appointment_slots = []
         
         for slot in available_slots:
@@ -221,7 +407,7 @@ class SchedulingAgent:
         )
     
     def update_doctor_schedule(self, selected_slot: AppointmentSlot, patient_type: str):
-        """Mark the booked slot(s) as unavailable in the Excel file"""
+        """Mark the booked slot(s) as unavailable and record them in the booking log"""
         try:
             if patient_type == "new":
                 # New patient needs 60 minutes = 2 consecutive 30-minute slots
@@ -236,46 +422,25 @@ class SchedulingAgent:
                 next_time_obj = (datetime.combine(datetime.today(), time_obj) + timedelta(minutes=30)).time()
                 next_time = next_time_obj.strftime('%H:%M')
                 
-                # Update BOTH slots
-                mask1 = (
-                    (self.schedule_df['doctor'] == selected_slot.doctor) &
-                    (self.schedule_df['location'] == selected_slot.location) &
-                    (self.schedule_df['date'] == selected_slot.date) &
-                    (self.schedule_df['time'] == selected_slot.time)
-                )
-                
-                mask2 = (
-                    (self.schedule_df['doctor'] == selected_slot.doctor) &
-                    (self.schedule_df['location'] == selected_slot.location) &
-                    (self.schedule_df['date'] == selected_slot.date) &
-                    (self.schedule_df['time'] == next_time)
-                )
-                
                 # Mark both slots as unavailable
-                self.schedule_df.loc[mask1, 'available'] = False
-                self.schedule_df.loc[mask1, 'duration_available'] = 0
-                self.schedule_df.loc[mask1, 'status'] = "Fully Booked (New Patient)"
-                
-                self.schedule_df.loc[mask2, 'available'] = False
-                self.schedule_df.loc[mask2, 'duration_available'] = 0
-                self.schedule_df.loc[mask2, 'status'] = "Fully Booked (New Patient)"
+                bookings = [
+                    [selected_slot.doctor, selected_slot.location, selected_slot.date,
+                     slot_time, "Fully Booked (New Patient)"]
+                    for slot_time in (selected_slot.time, next_time)
+                ]
                 
             else:
                 # Returning patient needs 30 minutes = 1 slot
-                mask = (
-                    (self.schedule_df['doctor'] == selected_slot.doctor) &
-                    (self.schedule_df['location'] == selected_slot.location) &
-                    (self.schedule_df['date'] == selected_slot.date) &
-                    (self.schedule_df['time'] == selected_slot.time)
-                )
-                
-                # Mark slot as unavailable
-                self.schedule_df.loc[mask, 'available'] = False
-                self.schedule_df.loc[mask, 'duration_available'] = 0
-                self.schedule_df.loc[mask, 'status'] = "Fully Booked (Returning Patient)"
+                bookings = [
+                    [selected_slot.doctor, selected_slot.location, selected_slot.date,
+                     selected_slot.time, "Fully Booked (Returning Patient)"]
+                ]
+            
+            for booking in bookings:
+                self._mark_slot_booked(*booking)
             
-            # Save the updated schedule
-            self.schedule_df.to_excel(self.schedule_excel_path, index=False)
+            # Log the booking instead of rewriting the whole workbook
+            self._append_booking_log(bookings)
             print(f" Updated doctor schedule: {patient_type} patient booked {selected_slot.time}")
             return True
             
@@ -346,22 +511,19 @@ class SchedulingAgent:
             next_time = (current_time + timedelta(minutes=30)).strftime('%H:%M')
             
             # Check if next slot exists and is available
-            next_slot_mask = (
-                (self.schedule_df['doctor'] == selected_slot.doctor) &
-                (self.schedule_df['location'] == selected_slot.location) &
-                (self.schedule_df['date'] == selected_slot.date) &
-                (self.schedule_df['time'] == next_time) &
-                (self.schedule_df['available'] == True)
+            next_row = self._slot_rows.get(
+                (selected_slot.doctor, selected_slot.location, selected_slot.date, next_time)
             )
             
-            if not next_slot_mask.any():
+            if next_row is None or not self.schedule_df.at[next_row, 'available']:
                 print(f" Next slot {next_time} not available for consecutive booking")
                 return False
             
             # Book both slots
             success1 = self.update_doctor_schedule(selected_slot, "consecutive_first")
+            # Derived from an already-validated slot, so skip revalidation
             success2 = self.update_doctor_schedule(
-                AppointmentSlot(
+                AppointmentSlot.model_construct(
                     doctor=selected_slot.doctor,
                     location=selected_slot.location,
                     date=selected_slot.date,
@@ -383,7 +545,7 @@ class SchedulingAgent:
             return " No schedule data loaded"
         
         total_slots = len(self.schedule_df)
-        available_slots = len(self.schedule_df[self.schedule_df['available'] == True])
+        available_slots = int(self.schedule_df['available'].sum())
         
         return (
             f" **Schedule Summary**\n"
@@ -5,16 +5,22 @@ Assignment: AI Scheduling Agent Case Study - Intern
 """
 
 import streamlit as st
+from streamlit.errors import StreamlitAPIException
 import sys
 import os
 from datetime import datetime
-import pandas as pd
 
-# Add project root to path
-sys.path.append('.')
+# Add project root to path once; Streamlit re-executes this script on every rerun
+PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
+if PROJECT_ROOT not in sys.path:
+    sys.path.append(PROJECT_ROOT)
 
-# Import our main application
-from main_simple import MedicalSchedulerApp
+# Rows per page in the full Excel data view
+EXCEL_PAGE_SIZE = 50
+APPOINTMENTS_FILE = "data/appointments.xlsx"
+
+# pandas-backed loaders and MedicalSchedulerApp (which pulls in LangChain) are
+# imported where they're first needed so the page paints before the heavy imports finish
 
 # Page configuration
 st.set_page_config(
@@ -117,23 +123,6 @@ st.markdown("""
         border-color: #2c5282;
     }
 
-    /* Suggestion Cards */
-    .suggestion-card {
-        background: #f7fafc;
-        padding: 1.2rem;
-        border-radius: 10px;
-        border: 1px solid #e2e8f0;
-        margin-bottom: 1rem;
-        transition: all 0.2s ease;
-        box-shadow: 0px 2px 4px rgba(0,0,0,0.05);
-    }
-    
-    .suggestion-card:hover {
-        background: #edf2f7;
-        transform: translateY(-1px);
-        box-shadow: 0px 4px 8px rgba(0,0,0,0.1);
-    }
-    
     /* Selection section styling */
     .selection-section {
         background: #ffffff;
@@ -150,16 +139,6 @@ st.markdown("""
         font-weight: 600;
     }
 
-    /* Enhanced Metrics */
-    .metric-card {
-        background: linear-gradient(135deg, #2c5282 0%, #3182ce 100%);
-        color: white;
-        padding: 1.2rem;
-        border-radius: 10px;
-        text-align: center;
-        margin-bottom: 1rem;
-    }
-
     /* Success Celebration */
     .celebration-box {
         font-family: 'Inter', sans-serif;
@@ -173,22 +152,6 @@ st.markdown("""
         margin: 2rem 0;
     }
 
-    /* Progress Indicators */
-    .progress-item {
-        display: flex;
-        align-items: center;
-        padding: 0.75rem;
-        margin: 0.5rem 0;
-        background: #f7fafc;
-        border-radius: 8px;
-        border-left: 4px solid #3182ce;
-        transition: all 0.2s ease;
-    }
-    
-    .progress-item:hover {
-        background: #edf2f7;
-    }
-
     /* Responsive Design */
     @media (max-width: 768px) {
         .main-header {
@@ -246,6 +209,7 @@ st.markdown("""
 def initialize_session_state():
     """Initialize session state variables"""
     if 'app' not in st.session_state:
+        from main_simple import MedicalSchedulerApp
         st.session_state.app = MedicalSchedulerApp()
     
     if 'conversation_started' not in st.session_state:
@@ -296,11 +260,7 @@ def display_sidebar():
         
         step_text = step_display.get(current_step, current_step.replace('_', ' ').title())
         
-        st.markdown(f"""
-        <div class="suggestion-card" style="background: linear-gradient(135deg, #2c5282 0%, #3182ce 100%); color: white;">
-            <h4 style="margin: 0; color: white;">{step_text}</h4>
-        </div>
-        """, unsafe_allow_html=True)
+        st.info(f"**{step_text}**")
         
         if state_summary.get('patient_name'):
             # Get patient type from app state
@@ -308,14 +268,9 @@ def display_sidebar():
             if hasattr(st.session_state.app, 'state') and st.session_state.app.state.get('lookup_result'):
                 patient_type = st.session_state.app.state['lookup_result'].patient_type.title()
             
-            st.markdown(f"""
-            <div class="suggestion-card">
-                <h4> Patient: {state_summary['patient_name']}</h4>
-                <p style="margin: 0.5rem 0 0 0; color: #4a5568; font-size: 0.9rem;">
-                    Type: {patient_type} Patient
-                </p>
-            </div>
-            """, unsafe_allow_html=True)
+            with st.container(border=True):
+                st.markdown(f"**Patient:** {state_summary['patient_name']}")
+                st.caption(f"Type: {patient_type} Patient")
         
         # User-focused Progress indicators (only show what matters to user)
         if current_step != 'greeting':
@@ -327,15 +282,11 @@ def display_sidebar():
                 ("✅ Confirmation", state_summary.get('reminders_scheduled', False))
             ]
             
+            completed_count = sum(completed for _, completed in progress_items)
+            st.progress(completed_count / len(progress_items))
+            
             for item, completed in progress_items:
-                status_icon = "✅" if completed else "⏳"
-                
-                st.markdown(f"""
-                <div class="progress-item">
-                    <span style="margin-right: 0.5rem; font-size: 1.1rem;">{status_icon}</span>
-                    <span style="color: {'#2d3748' if completed else '#718096'};">{item}</span>
-                </div>
-                """, unsafe_allow_html=True)
+                st.checkbox(item, value=completed, disabled=True)
     
     # Enhanced Controls
     st.markdown("#### 🎮 Controls")
@@ -388,6 +339,14 @@ def display_sidebar():
     </div>
     """, unsafe_allow_html=True)
 
+def rerun_chat():
+    """Rerun only the chat fragment, falling back to a full rerun outside fragment runs"""
+    try:
+        st.rerun(scope="fragment")
+    except StreamlitAPIException:
+        st.rerun()
+
+@st.fragment
 def display_chat_interface():
     """Display the enhanced chat interface with clickable options"""
     st.subheader("🤖 AI Agent Conversation")
@@ -431,13 +390,13 @@ def display_chat_interface():
                     greeting = st.session_state.app.start_conversation()
                     st.session_state.messages.append({"role": "agent", "content": greeting})
                     st.session_state.conversation_started = True
-                    st.rerun()
+                    rerun_chat()
             with col2:
                 if st.button("⚡ Quick Demo", type="secondary", use_container_width=True):
                     demo_response = "Hello! I'm your AI scheduling assistant. Let me help you book an appointment. I'll need some basic information from you. Let's start with your full name."
                     st.session_state.messages.append({"role": "agent", "content": demo_response})
                     st.session_state.conversation_started = True
-                    st.rerun()
+                    rerun_chat()
         else:
             # Show smart suggestions based on conversation context
             current_step = st.session_state.app.state.get("current_step", "greeting")
@@ -588,10 +547,13 @@ def display_smart_suggestions(current_step):
 def process_user_input(user_input):
     """Process user input and update conversation"""
     st.session_state.messages.append({"role": "user", "content": user_input})
+    step_before = st.session_state.app.state.get("current_step")
     
     with st.spinner("🤖 Processing your request..."):
         try:
-            response = st.session_state.app.process_user_input(user_input)
+            # Show tokens as they arrive; the full response is rendered from history after rerun
+            st.write_stream(st.session_state.app.stream_user_input(user_input))
+            response = st.session_state.app.state.get("agent_response") or ""
             
             # Clean up response for presentation (remove technical details)
             clean_response = clean_response_for_presentation(response)
@@ -607,7 +569,12 @@ def process_user_input(user_input):
             error_msg = "I apologize, but I encountered an issue. Please try again or contact our support team."
             st.session_state.messages.append({"role": "agent", "content": error_msg})
     
-    st.rerun()
+    # Turns within a step only rerun the chat fragment; a step change also
+    # updates the sidebar status and page layout, so rerun the whole app
+    if st.session_state.app.state.get("current_step") == step_before:
+        rerun_chat()
+    else:
+        st.rerun()
 
 def clean_response_for_presentation(response):
     """Clean up agent response for better presentation"""
@@ -652,46 +619,16 @@ def display_completion_summary():
     col1, col2, col3, col4 = st.columns(4)
     
     with col1:
-        status = " Success" if state_summary.get('excel_exported') else " Failed"
-        color = "#38a169" if state_summary.get('excel_exported') else "#e53e3e"
-        st.markdown(f"""
-        <div style="text-align: center; padding: 1rem; background: {color}; color: white; border-radius: 8px;">
-            <h3 style="margin: 0; color: white;">📊</h3>
-            <p style="margin: 0; color: white;">Excel Export</p>
-            <small style="color: white; opacity: 0.9;">{status}</small>
-        </div>
-        """, unsafe_allow_html=True)
+        st.metric("📊 Excel Export", "Success" if state_summary.get('excel_exported') else "Failed")
     
     with col2:
-        status = " Sent" if state_summary.get('form_sent') else " Failed"
-        color = "#38a169" if state_summary.get('form_sent') else "#e53e3e"
-        st.markdown(f"""
-        <div style="text-align: center; padding: 1rem; background: {color}; color: white; border-radius: 8px;">
-            <h3 style="margin: 0; color: white;">📋</h3>
-            <p style="margin: 0; color: white;">Forms</p>
-            <small style="color: white; opacity: 0.9;">{status}</small>
-        </div>
-        """, unsafe_allow_html=True)
+        st.metric("📋 Forms", "Sent" if state_summary.get('form_sent') else "Failed")
     
     with col3:
-        status = " Scheduled" if state_summary.get('reminders_scheduled') else " Not Set"
-        color = "#38a169" if state_summary.get('reminders_scheduled') else "#e53e3e"
-        st.markdown(f"""
-        <div style="text-align: center; padding: 1rem; background: {color}; color: white; border-radius: 8px;">
-            <h3 style="margin: 0; color: white;">⏰</h3>
-            <p style="margin: 0; color: white;">Reminders</p>
-            <small style="color: white; opacity: 0.9;">{status}</small>
-        </div>
-        """, unsafe_allow_html=True)
+        st.metric("⏰ Reminders", "Scheduled" if state_summary.get('reminders_scheduled') else "Not Set")
     
     with col4:
-        st.markdown(f"""
-        <div style="text-align: center; padding: 1rem; background: #38a169; color: white; border-radius: 8px;">
-            <h3 style="margin: 0; color: white;">✅</h3>
-            <p style="margin: 0; color: white;">Status</p>
-            <small style="color: white; opacity: 0.9;">Complete</small>
-        </div>
-        """, unsafe_allow_html=True)
+        st.metric("✅ Status", "Complete")
     
     st.markdown("### 🚀 Next Steps")
     col1, col2, col3 = st.columns(3)
@@ -710,37 +647,37 @@ def display_completion_summary():
                 del st.session_state[key]
             st.rerun()
 
+DEMO_STEPS = [
+    ("1️⃣ Start", "Click 'Start Appointment Booking'", "Begin the AI conversation"),
+    ("2️⃣ Name", "Enter: 'John Smith'", "AI will guide you through each step"),
+    ("3️⃣ Details", "Provide DOB, Phone, Email", "Use natural language or buttons"),
+    ("4️⃣ Preferences", "Select Doctor & Location", "Click the suggestion buttons"),
+    ("5️⃣ Schedule", "Choose appointment slot", "Pick from available times"),
+    ("6️⃣ Insurance", "Select insurance carrier", "Quick selection options"),
+    ("7️⃣ Complete", "Automatic confirmation", "System handles the rest")
+]
+
+@st.cache_resource
+def _demo_steps_html():
+    """Build the demo step cards once per server process"""
+    return "".join(f"""
+    <div style="display: flex; align-items: center; margin: 0.75rem 0; padding: 1rem; background: #ffffff; border-radius: 8px; border: 1px solid #e2e8f0; box-shadow: 0px 2px 4px rgba(0,0,0,0.05);">
+        <div style="margin-right: 1rem; font-size: 1.5rem;">{step}</div>
+        <div style="flex: 1;">
+            <div style="font-weight: 500; color: #2d3748;">{action}</div>
+            <div style="font-size: 0.9rem; color: #718096;">{tip}</div>
+        </div>
+    </div>
+    """ for step, action, tip in DEMO_STEPS)
+
 def display_quick_demo():
     """Display presentation-focused demo section"""
     with st.expander("Quick Demo Guide", expanded=False):
         
-        st.markdown("""
-        <div class="suggestion-card" style="background: linear-gradient(135deg, #2c5282 0%, #3182ce 100%); color: white;">
-            <h3 style="color: white; margin-bottom: 1rem;">🎯 Demo Flow (2-3 minutes)</h3>
-            <p style="color: white; opacity: 0.9;">Follow this sequence for a complete demonstration:</p>
-        </div>
-        """, unsafe_allow_html=True)
+        st.markdown("#### 🎯 Demo Flow (2-3 minutes)")
+        st.caption("Follow this sequence for a complete demonstration:")
         
-        demo_steps = [
-            ("1️⃣ Start", "Click 'Start Appointment Booking'", "Begin the AI conversation"),
-            ("2️⃣ Name", "Enter: 'John Smith'", "AI will guide you through each step"),
-            ("3️⃣ Details", "Provide DOB, Phone, Email", "Use natural language or buttons"),
-            ("4️⃣ Preferences", "Select Doctor & Location", "Click the suggestion buttons"),
-            ("5️⃣ Schedule", "Choose appointment slot", "Pick from available times"),
-            ("6️⃣ Insurance", "Select insurance carrier", "Quick selection options"),
-            ("7️⃣ Complete", "Automatic confirmation", "System handles the rest")
-        ]
-        
-        for step, action, tip in demo_steps:
-            st.markdown(f"""
-            <div style="display: flex; align-items: center; margin: 0.75rem 0; padding: 1rem; background: #ffffff; border-radius: 8px; border: 1px solid #e2e8f0; box-shadow: 0px 2px 4px rgba(0,0,0,0.05);">
-                <div style="margin-right: 1rem; font-size: 1.5rem;">{step}</div>
-                <div style="flex: 1;">
-                    <div style="font-weight: 500; color: #2d3748;">{action}</div>
-                    <div style="font-size: 0.9rem; color: #718096;">{tip}</div>
-                </div>
-            </div>
-            """, unsafe_allow_html=True)
+        st.markdown(_demo_steps_html(), unsafe_allow_html=True)
         
         st.markdown("""
         <div style="background: #f0fff4; border: 1px solid #9ae6b4; border-radius: 8px; padding: 1rem; margin-top: 1rem;">
@@ -793,13 +730,52 @@ def display_system_features():
         - 3-Tier Reminder System
         """)
 
+def appointment_column_config():
+    """Column formatting for the appointments table"""
+    return {
+        "appointment_id": st.column_config.TextColumn("Appointment ID"),
+        "patient_name": st.column_config.TextColumn("Patient"),
+        "appointment_date": st.column_config.DateColumn("Date", format="YYYY-MM-DD"),
+        "appointment_time": st.column_config.TextColumn("Time"),
+        "duration": st.column_config.NumberColumn("Duration", format="%d min"),
+        "reminders_sent": st.column_config.NumberColumn("Reminders"),
+        "form_sent": st.column_config.CheckboxColumn("Forms Sent"),
+        "excel_exported": st.column_config.CheckboxColumn("Excel Exported"),
+    }
+
+@st.cache_resource
+def _excel_executor():
+    """Shared worker thread for background Excel reads"""
+    from concurrent.futures import ThreadPoolExecutor
+    return ThreadPoolExecutor(max_workers=1, thread_name_prefix="excel-loader")
+
+def prefetch_excel_data():
+    """Start reading the appointments file in the background, once per file version"""
+    try:
+        mtime = os.path.getmtime(APPOINTMENTS_FILE)
+    except OSError:
+        mtime = None
+    
+    if st.session_state.get('excel_mtime') != mtime or 'excel_future' not in st.session_state:
+        from utils.data_loader import load_excel
+        st.session_state.excel_future = _excel_executor().submit(load_excel, APPOINTMENTS_FILE)
+        st.session_state.excel_mtime = mtime
+
 def display_excel_data():
     """Display Excel export data if available"""
     if st.session_state.appointment_completed:
         st.subheader("Excel Export Data")
         
         try:
-            appointments_df = pd.read_excel("data/appointments.xlsx")
+            import pandas as pd
+            prefetch_excel_data()
+            future = st.session_state.excel_future
+            if future.done():
+                appointments_df = future.result()
+            else:
+                with st.status("Loading appointments...") as status:
+                    appointments_df = future.result()
+                    status.update(label="Appointments loaded", state="complete")
             
             if not appointments_df.empty:
                 st.success(f"Found {len(appointments_df)} appointments in Excel file")
@@ -823,8 +799,18 @@ def display_excel_data():
                     st.write(f"Insurance: {latest_appointment.get('insurance_carrier', 'N/A')}")
                     st.write(f"Status: {latest_appointment.get('status', 'N/A')}")
                 
-                with st.expander("View Full Excel Data", expanded=False):
-                    st.dataframe(appointments_df, width='stretch')
+                # st.expander always sends its contents, so gate the table on a toggle
+                # and page it to keep the payload bounded as the file grows
+                if st.toggle("View Full Excel Data", value=False):
+                    page_count = max(1, -(-len(appointments_df) // EXCEL_PAGE_SIZE))
+                    page = st.number_input("Page", min_value=1, max_value=page_count, value=1, step=1)
+                    start = (page - 1) * EXCEL_PAGE_SIZE
+                    page_df = appointments_df.iloc[start:start + EXCEL_PAGE_SIZE].copy()
+                    if 'appointment_date' in page_df.columns:
+                        page_df['appointment_date'] = pd.to_datetime(page_df['appointment_date'], errors='coerce')
+                    # Format in the frontend grid via column_config rather than a pandas Styler
+                    st.dataframe(page_df, width='stretch', hide_index=True, column_config=appointment_column_config())
+                    st.caption(f"Page {page} of {page_count}")
             else:
                 st.info("Excel file exists but is empty")
                 
@@ -835,8 +821,13 @@ def display_excel_data():
 
 def main():
     """Main Streamlit application"""
-    initialize_session_state()
+    # Header first so it paints while the app's imports load
     display_header()
+    initialize_session_state()
+    
+    # Start the Excel read now so it overlaps with rendering the chat
+    if st.session_state.appointment_completed:
+        prefetch_excel_data()
     
     # Main layout - focus on chat interface
     col1, col2 = st.columns([3, 1])
@@ -1,87 +1,161 @@
+import os
+import sys
 import pandas as pd
-import random
+import numpy as np
+import itertools
 from datetime import datetime, timedelta
+from multiprocessing import Pool
 from faker import Faker
+from utils.data_loader import load_excel, save_excel
+
+SEED = 42
 
 fake = Faker()
+Faker.seed(SEED)
+rng = np.random.default_rng(SEED)
+
+def _sample_names(names, size):
+    """Draw names from one of Faker's weighted name tables in a single call"""
+    values = np.array(list(names))
+    weights = np.array(list(names.values()), dtype=float) if hasattr(names, 'values') else None
+    return rng.choice(values, size, p=None if weights is None else weights / weights.sum())
+
+def _word_table(provider_name, attribute, fallback, pool_size=200):
+    """One of Faker's word tables, or a pool built through its public API when the
+    locale's provider doesn't expose that attribute"""
+    table = getattr(fake.provider(provider_name), attribute, None)
+    if table:
+        return table
+    return sorted({fallback() for _ in range(pool_size)})
+
+def _years_ago(today, years):
+    """The same calendar day `years` years before today (Feb 29 falls back to Feb 28)"""
+    try:
+        return today.replace(year=today.year - years)
+    except ValueError:
+        return today.replace(year=today.year - years, day=28)
+
+def _random_dates(start, end, size):
+    """Uniformly draw dates between start and end"""
+    days = rng.integers(0, (end - start).days + 1, size)
+    return pd.to_datetime(start) + pd.to_timedelta(days, unit='D')
+
+# Byte positions of the digits and punctuation in "(XXX) XXX-XXXX"
+PHONE_DIGIT_POSITIONS = [1, 2, 3, 6, 7, 8, 10, 11, 12, 13]
+PHONE_PUNCTUATION = {0: '(', 4: ')', 5: ' ', 9: '-'}
 
-def generate_patient_data():
-    """Generate 50 synthetic patients with Pydantic-compatible data"""
-    patients = []
+def _format_phones(numbers):
+    """Format 10-digit integers as (XXX) XXX-XXXX strings without a per-row format call"""
+    digits = (numbers[:, None] // 10 ** np.arange(9, -1, -1, dtype=np.int64)) % 10
+    out = np.empty((len(numbers), 14), dtype=np.uint8)
+    for position, char in PHONE_PUNCTUATION.items():
+        out[:, position] = ord(char)
+    out[:, PHONE_DIGIT_POSITIONS] = digits + ord('0')
+    return out.view('S14').ravel().astype(str)
+
+def _address_chunk(args):
+    """Generate one worker's share of addresses with its own seeded Faker"""
+    seed, count = args
+    worker_fake = Faker()
+    worker_fake.seed_instance(seed)
+    return [worker_fake.address().replace('\n', ', ') for _ in range(count)]
+
+def _generate_addresses(count, parallel=False):
+    """Generate street addresses, optionally spread across a process pool"""
+    if not parallel:
+        # Bind the Faker proxy lookup once
+        address = fake.address
+        return [address().replace('\n', ', ') for _ in range(count)]
+    
+    workers = os.cpu_count() or 1
+    sizes = [count // workers + (1 if i < count % workers else 0) for i in range(workers)]
+    with Pool(workers) as pool:
+        chunks = pool.map(_address_chunk, [(SEED + i, n) for i, n in enumerate(sizes) if n])
+    return list(itertools.chain.from_iterable(chunks))
+
+def generate_patient_data(num_patients=50, num_returning=30, parallel=False):
+    """Generate synthetic patients with Pydantic-compatible data"""
+    
+    # Build each column in one batch instead of one dict per patient
+    phones = _format_phones(rng.integers(0, 10**10, num_patients))
+    
+    # Sample from Faker's own name tables rather than calling Faker per row
+    first_names = _sample_names(_word_table('faker.providers.person', 'first_names', fake.first_name), num_patients)
+    last_names = _sample_names(_word_table('faker.providers.person', 'last_names', fake.last_name), num_patients)
+    
+    domains = _sample_names(
+        _word_table('faker.providers.internet', 'free_email_domains', fake.free_email_domain), num_patients
+    )
+    emails = [f"{first.lower()}.{last.lower()}{n}@{domain}"
+              for first, last, n, domain in zip(first_names, last_names, rng.integers(1, 100, num_patients), domains)]
+    
+    # DOB in MM/DD/YYYY format - ensure consistency (ages 18 to 80 inclusive, by calendar years)
+    today = datetime.now().date()
+    dobs = _random_dates(_years_ago(today, 81) + timedelta(days=1), _years_ago(today, 18), num_patients)
+    
+    last_visits = list(_random_dates(today - timedelta(days=2 * 365), today - timedelta(days=30), num_returning)
+                       .strftime('%Y-%m-%d')) + [None] * (num_patients - num_returning)
+    
+    carriers = ['Blue Cross Blue Shield', 'Aetna', 'Cigna', 'UnitedHealth', 'Kaiser']
+    
+    df = pd.DataFrame({
+        'patient_id': [f'PAT_{i+1:03d}' for i in range(num_patients)],
+        'first_name': first_names,
+        'last_name': last_names,
+        'dob': dobs.strftime('%m/%d/%Y'),  # Now guaranteed MM/DD/YYYY format
+        'phone': phones,  # Now guaranteed (XXX) XXX-XXXX format
+        'email': emails,
+        'address': _generate_addresses(num_patients, parallel),
+        'last_visit': last_visits,
+        'patient_type': ['returning'] * num_returning + ['new'] * (num_patients - num_returning),
+        'insurance_carrier': rng.choice(carriers, num_patients),
+        'member_id': [f"{n:011d}" for n in rng.integers(0, 10**11, num_patients)],
+        'group_number': [f"GRP{n:04d}" for n in rng.integers(0, 10000, num_patients)]
+    })
     
-    for i in range(50):
-        has_visit_history = i < 30
-        last_visit = None
-        
-        if has_visit_history:
-            last_visit = fake.date_between(start_date='-2y', end_date='-30d')
-        
-        # Generate proper phone number (10 digits, no negative)
-        phone_digits = ''.join([str(random.randint(0, 9)) for _ in range(10)])
-        phone = f"({phone_digits[:3]}) {phone_digits[3:6]}-{phone_digits[6:]}"
-        
-        # Generate DOB in MM/DD/YYYY format - ensure consistency
-        birth_date = fake.date_of_birth(minimum_age=18, maximum_age=80)
-        dob = f"{birth_date.month:02d}/{birth_date.day:02d}/{birth_date.year}"
-        
-        patient = {
-            'patient_id': f'PAT_{i+1:03d}',
-            'first_name': fake.first_name(),
-            'last_name': fake.last_name(),
-            'dob': dob,  # Now guaranteed MM/DD/YYYY format
-            'phone': phone,  # Now guaranteed (XXX) XXX-XXXX format
-            'email': fake.email(),
-            'address': fake.address().replace('\n', ', '),
-            'last_visit': last_visit.strftime('%Y-%m-%d') if last_visit else None,
-            'patient_type': 'returning' if has_visit_history else 'new',
-            'insurance_carrier': random.choice(['Blue Cross Blue Shield', 'Aetna', 'Cigna', 'UnitedHealth', 'Kaiser']),
-            'member_id': fake.bothify(text='###########'),
-            'group_number': fake.bothify(text='GRP####')
-        }
-        patients.append(patient)
-    
-    df = pd.DataFrame(patients)
     df.to_csv('data/patients.csv', index=False)
-    print(f"✅ Generated {len(patients)} patients")
+    print(f"✅ Generated {len(df)} patients")
     return df
 
 def generate_doctor_schedule_v2():
     """Generate doctor availability schedule with 30-minute slots"""
     doctors = ['Dr. Naveen', 'Dr. Naresh', 'Dr. Aish', 'Dr. Shreyansh']
     locations = ['Gachibowli', 'Jubliee Hills', 'Banjara Hills']
-    schedule_data = []
     
     print("🔄 Generating doctor schedules with 30-minute slots...")
     
-    for i in range(14):  # 14 days ahead
-        date = datetime.now() + timedelta(days=i+1)
-        if date.weekday() >= 5:  # Skip weekends
-            continue
-            
-        print(f"   📅 Generating slots for {date.strftime('%Y-%m-%d')}")
-        
-        for doctor in doctors:
-            for location in locations:
-                for hour in range(9, 17):  # 9 AM to 5 PM
-                    for minute in [0, 30]:  # Every 30 minutes
-                        slot_time = datetime.combine(date.date(), datetime.min.time().replace(hour=hour, minute=minute))
-                        is_available = random.random() < 0.8  # 80% availability
-                        
-                        schedule_data.append({
-                            'doctor': doctor,
-                            'location': location,
-                            'date': date.strftime('%Y-%m-%d'),
-                            'time': slot_time.strftime('%H:%M'),
-                            'available': is_available,
-                            'duration_available': 30 if is_available else 0  # 🆕 FIX: 30 minutes per slot
-                        })
-    
-    df = pd.DataFrame(schedule_data)
-    df.to_excel('data/doctors_schedule.xlsx', index=False)
+    # 14 days ahead, skipping weekends - formatted once up front
+    today = datetime.now()
+    dates = [d.strftime('%Y-%m-%d') for d in (today + timedelta(days=i+1) for i in range(14)) if d.weekday() < 5]
+    for date in dates:
+        print(f"   📅 Generating slots for {date}")
+    
+    # Every 30 minutes from 9 AM to 5 PM
+    times = [f"{hour:02d}:{minute:02d}" for hour in range(9, 17) for minute in (0, 30)]
+    
+    # Build the Cartesian product column-wise instead of one dict per slot
+    date_col, doctor_col, location_col, time_col = zip(*itertools.product(
+        dates, doctors, locations, times
+    ))
+    is_available = rng.random(len(date_col)) < 0.8  # 80% availability
+    
+    df = pd.DataFrame({
+        'doctor': doctor_col,
+        'location': location_col,
+        'date': date_col,
+        'time': time_col,
+        'available': is_available,
+        'duration_available': np.where(is_available, 30, 0)  # 🆕 FIX: 30 minutes per slot
+    })
+    save_excel(df, 'data/doctors_schedule.xlsx')
+    
+    # Bookings logged against the previous schedule no longer apply
+    if os.path.exists('data/doctors_schedule_bookings.csv'):
+        os.remove('data/doctors_schedule_bookings.csv')
     
     # Show summary
     total_slots = len(df)
-    available_slots = len(df[df['available'] == True])
+    available_slots = int(df['available'].sum())
     
     print(f"✅ Generated doctor schedules")
     print(f"   📊 Total slots: {total_slots}")
@@ -97,13 +171,13 @@ def create_appointments_file():
         'date', 'time', 'duration', 'status', 'insurance_carrier', 
         'member_id', 'group_number', 'created_at', 'form_sent', 'reminders_sent'
     ])
-    appointments.to_excel('data/appointments.xlsx', index=False)
+    save_excel(appointments, 'data/appointments.xlsx')
     print("✅ Created appointments file")
 
 def show_schedule_sample():
     """Show a sample of the generated schedule"""
     try:
-        df = pd.read_excel('data/doctors_schedule.xlsx')
+        df = load_excel('data/doctors_schedule.xlsx', parquet_cache=True)
         
         print("\n📋 Sample Schedule (First 10 rows):")
         print("=" * 80)
@@ -117,10 +191,8 @@ def show_schedule_sample():
         
         # Show availability by doctor
         print(f"\nAvailability by Doctor:")
-        for doctor in df['doctor'].unique():
-            doctor_slots = df[df['doctor'] == doctor]
-            available = len(doctor_slots[doctor_slots['available'] == True])
-            total = len(doctor_slots)
+        availability = df.groupby('doctor', sort=False)['available'].agg(['sum', 'size'])
+        for doctor, (available, total) in availability.iterrows():
             print(f"   {doctor}: {available}/{total} slots available ({available/total*100:.1f}%)")
         
     except Exception as e:
@@ -130,11 +202,10 @@ if __name__ == "__main__":
     print("Generating synthetic data (Version 2)...")
     print("=" * 50)
     
-    import os
     os.makedirs('data', exist_ok=True)
     
-    # Generate data
-    patients_df = generate_patient_data()
+    # Generate data (--parallel spreads Faker address generation over a process pool)
+    patients_df = generate_patient_data(parallel='--parallel' in sys.argv)
     schedule_df = generate_doctor_schedule_v2()
     create_appointments_file()
     
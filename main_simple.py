@@ -1,38 +1,109 @@
 import os
-from typing import Dict, Any, Optional
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import cached_property
+from typing import Dict, Any, Optional, Iterator
 from dotenv import load_dotenv
 from agents import BookingState, create_initial_state
-from agents.greeting_agent import GreetingAgent
-from agents.lookup_agent import LookupAgent
-from agents.scheduling_agent import SchedulingAgent
-from agents.insurance_agent import InsuranceAgent
-from agents.confirmation_agent import ConfirmationAgent
-from agents.form_distribution import FormDistributionAgent
-from agents.reminder_agent import ReminderAgent
 
 load_dotenv()
 
+# Static parts of the booking summary, built once instead of per booking
+BOOKING_FORMS_NOTE = (
+    "**Patient Intake Forms**\n"
+    "Your intake forms have been sent to your email\n"
+    "Please complete them before your appointment\n\n"
+)
+BOOKING_REMINDER_SCHEDULE = (
+    "• 24 hours before your appointment\n"
+    "• 2 hours before (with form completion check)\n"
+    "• 1 hour before (final confirmation)\n\n"
+    "**Your Appointment is All Set!**\n\n"
+    "**Quick Summary:**\n"
+)
+BOOKING_NEXT_STEPS = (
+    "**What's Next?**\n"
+    "1. Check your email for confirmation details\n"
+    "2. Complete the intake forms we sent you\n"
+    "3. Arrive 15 minutes early for check-in\n\n"
+    "**Need to make changes?** Contact our office with your Appointment ID.\n\n"
+    "Thank you for choosing our medical practice! 🏥"
+)
+
 class MedicalSchedulerApp:
     """Simplified Medical Scheduler with LangGraph-style state management"""
     
+    # Workflow routing is static, so it is built once and shared by every instance
+    _STEP_HANDLERS = {
+        "greeting": "_handle_greeting",
+        "slot_selection": "_handle_slot_selection",
+        "insurance": "_handle_insurance",
+    }
+    
     def __init__(self):
-        # Initialize all agents
-        self.greeting_agent = GreetingAgent()
-        self.lookup_agent = LookupAgent()
-        self.scheduling_agent = SchedulingAgent()
-        self.insurance_agent = InsuranceAgent()
-        self.confirmation_agent = ConfirmationAgent(mock_mode=False)
-        self.form_agent = FormDistributionAgent(mock_mode=False)
-        self.reminder_agent = ReminderAgent(mock_mode=False)
+        # Agents are imported and created on first use (see the properties below)
         
         # Initialize state
         self.state = create_initial_state()
+        
+        # Bumped whenever a turn may have mutated state; keys the summary cache
+        self._state_version = 0
+        self._summary_cache = None
+    
+    @cached_property
+    def greeting_agent(self):
+        from agents.greeting_agent import GreetingAgent
+        return GreetingAgent()
+    
+    @cached_property
+    def lookup_agent(self):
+        from agents.lookup_agent import LookupAgent
+        return LookupAgent()
+    
+    @cached_property
+    def scheduling_agent(self):
+        from agents.scheduling_agent import SchedulingAgent
+        return SchedulingAgent()
+    
+    @cached_property
+    def insurance_agent(self):
+        from agents.insurance_agent import InsuranceAgent
+        return InsuranceAgent()
+    
+    @cached_property
+    def confirmation_agent(self):
+        from agents.confirmation_agent import ConfirmationAgent
+        return ConfirmationAgent(mock_mode=False)
+    
+    @cached_property
+    def form_agent(self):
+        from agents.form_distribution import FormDistributionAgent
+        return FormDistributionAgent(mock_mode=False)
+    
+    @cached_property
+    def reminder_agent(self):
+        from agents.reminder_agent import ReminderAgent
+        return ReminderAgent(mock_mode=False)
+    
+    def reset_state(self):
+        """Start a fresh booking while keeping the already-built agents"""
+        self.state = create_initial_state()
+        # The greeting agent carries the previous booking's collected fields
+        if "greeting_agent" in self.__dict__:
+            self.greeting_agent.reset()
+        self._bump_state_version()
+    
+    def _bump_state_version(self):
+        """Invalidate cached views of the state after a mutation"""
+        self._state_version += 1
     
     def start_conversation(self) -> str:
         """Start the conversation and return greeting message"""
         greeting = self.greeting_agent.get_greeting_message()
         self.state["agent_response"] = greeting
         self.state["conversation_history"].append(f"Agent: {greeting}")
+        self._bump_state_version()
         return greeting
     
     def process_user_input(self, user_input: str) -> str:
@@ -43,60 +114,119 @@ class MedicalSchedulerApp:
             
             current_step = self.state.get("current_step", "greeting")
             
-            if current_step == "greeting":
-                return self._handle_greeting(user_input)
-            elif current_step == "slot_selection":
-                return self._handle_slot_selection(user_input)
-            elif current_step == "insurance":
-                return self._handle_insurance(user_input)
-            else:
+            handler = self._STEP_HANDLERS.get(current_step)
+            if handler is None:
                 return "I'm not sure what to do next. Let me restart the process."
+            return getattr(self, handler)(user_input)
                 
         except Exception as e:
             error_msg = f"Sorry, there was an error: {e}"
             self.state["errors"].append(str(e))
             return error_msg
+        finally:
+            self._bump_state_version()
+    
+    def stream_user_input(self, user_input: str) -> Iterator[str]:
+        """Process user input, yielding LLM tokens as they arrive.
+        
+        The turn runs on a worker thread so greeting-agent tokens can be yielded
+        while the LLM is still generating; whatever the step adds around the
+        streamed text is yielded afterwards. Other steps don't call the LLM and
+        yield the whole response at once. The final response is left in
+        state["agent_response"].
+        """
+        tokens = queue.Queue()
+        result = {}
+        # Only the greeting step streams, so other steps don't build the greeting agent
+        stream_greeting = self.state.get("current_step", "greeting") == "greeting"
+        
+        def run_turn():
+            if stream_greeting:
+                self.greeting_agent.token_callback = tokens.put
+            try:
+                result['response'] = self.process_user_input(user_input)
+            finally:
+                if stream_greeting:
+                    self.greeting_agent.token_callback = None
+                tokens.put(None)
+        
+        worker = threading.Thread(target=run_turn, daemon=True)
+        worker.start()
+        
+        streamed = []
+        while (token := tokens.get()) is not None:
+            streamed.append(token)
+            yield token
+        worker.join()
+        
+        response = result.get('response', '')
+        self.state["agent_response"] = response
+        yield self._unstreamed_remainder(''.join(streamed), response)
+    
+    @staticmethod
+    def _unstreamed_remainder(streamed: str, response: str) -> str:
+        """The part of the final response not already covered by the streamed tokens"""
+        head = streamed.strip()
+        if not head:
+            return response
+        start = response.find(head)
+        if start != -1 and not response[:start].strip():
+            return response[start + len(head):]
+        # The streamed text isn't a prefix of the reply (e.g. an error fallback); show it all
+        return "\n\n" + response
     
     def _handle_greeting(self, user_input: str) -> str:
         """Handle greeting phase"""
+        from models import PATIENT_INFO_ADAPTER
         try:
-            # Process patient information
-            response, is_complete, data = self.greeting_agent.process_input(user_input, self.state)
-            
-            if is_complete:
-                # Convert to PatientInfo model
-                from models import PatientInfo
+            if user_input.lstrip().startswith('{'):
+                # A front-end can submit the whole form as one JSON object;
+                # validate it straight from the string in a single parse
                 try:
-                    patient_info = PatientInfo(**data)
-                    self.state["patient_info"] = patient_info
-                    
-                    # Move to lookup phase
-                    lookup_response = self._do_lookup()
-                    scheduling_response = self._do_scheduling()
-                    
-                    combined_response = f"{response}\n\n{lookup_response}\n\n{scheduling_response}"
-                    self.state["current_step"] = "slot_selection"
-                    
-                    return combined_response
-                    
+                    patient_info = PATIENT_INFO_ADAPTER.validate_json(user_input)
                 except Exception as e:
                     return f"Error processing patient information: {e}"
+                response = f"Thank you, {patient_info.patient_name}! I have all your details."
             else:
-                return response
+                # Process patient information
+                response, is_complete, data = self.greeting_agent.process_input(user_input, self.state)
+                
+                if not is_complete:
+                    return response
+                
+                # Convert to PatientInfo model
+                try:
+                    patient_info = PATIENT_INFO_ADAPTER.validate_python(data)
+                except Exception as e:
+                    return f"Error processing patient information: {e}"
+            
+            # Dump once; later steps read fields from this dict instead of the model
+            self.state.update(patient_info=patient_info, patient_info_dict=patient_info.model_dump())
+            
+            # Move to lookup phase, sharing one patient_data dict
+            patient_data = self._patient_data()
+            lookup_response = self._do_lookup(patient_data)
+            scheduling_response = self._do_scheduling(patient_data)
+            
+            combined_response = f"{response}\n\n{lookup_response}\n\n{scheduling_response}"
+            self.state["current_step"] = "slot_selection"
+            
+            return combined_response
                 
         except Exception as e:
             return f"Error in greeting phase: {e}"
     
-    def _do_lookup(self) -> str:
+    def _patient_data(self) -> Dict[str, Any]:
+        """Patient fields shared by the lookup and scheduling agents"""
+        if self.state.get("patient_info_dict") is None:
+            self.state["patient_info_dict"] = self.state["patient_info"].model_dump()
+        return self.state["patient_info_dict"]
+    
+    def _do_lookup(self, patient_data: Optional[Dict[str, Any]] = None) -> str:
         """Perform patient lookup"""
         try:
-            patient_data = {
-                'patient_name': self.state["patient_info"].patient_name,
-                'date_of_birth': self.state["patient_info"].date_of_birth,
-                'phone': self.state["patient_info"].phone,  # ✅ ADD THIS LINE
-                'preferred_doctor': self.state["patient_info"].preferred_doctor,
-                'location': self.state["patient_info"].location
-            }
+            if patient_data is None:
+                patient_data = self._patient_data()
             
             response, lookup_result = self.lookup_agent.search_patient(patient_data)
             self.state["lookup_result"] = lookup_result
@@ -107,18 +237,15 @@ class MedicalSchedulerApp:
         except Exception as e:
             return f"Error in patient lookup: {e}"
     
-    def _do_scheduling(self) -> str:
+    def _do_scheduling(self, patient_data: Optional[Dict[str, Any]] = None) -> str:
         """Find available appointment slots"""
         try:
             # ✅ ADD THIS CHECK
             if not self.state.get("lookup_result"):
                 return "❌ Error: Patient lookup failed. Please try again."
             
-            patient_data = {
-                'patient_name': self.state["patient_info"].patient_name,
-                'preferred_doctor': self.state["patient_info"].preferred_doctor,
-                'location': self.state["patient_info"].location
-            }
+            if patient_data is None:
+                patient_data = self._patient_data()
             
             response, slots = self.scheduling_agent.find_available_slots(
                 patient_data, self.state["lookup_result"]
@@ -143,8 +270,7 @@ class MedicalSchedulerApp:
             # Auto-select first slot for demo
             if user_input.lower() in ['1', 'first', 'yes'] or user_input.strip() == "":
                 selected_slot = available_slots[0]
-                self.state["selected_slot"] = selected_slot
-                self.state["current_step"] = "insurance"
+                self.state.update(selected_slot=selected_slot, current_step="insurance")
                 
                 # Start insurance collection
                 insurance_greeting = self.insurance_agent.get_insurance_greeting(
@@ -168,8 +294,7 @@ class MedicalSchedulerApp:
                     slot_index = int(user_input) - 1
                     if 0 <= slot_index < len(available_slots):
                         selected_slot = available_slots[slot_index]
-                        self.state["selected_slot"] = selected_slot
-                        self.state["current_step"] = "insurance"
+                        self.state.update(selected_slot=selected_slot, current_step="insurance")
                         
                         insurance_greeting = self.insurance_agent.get_insurance_greeting(
                             self.state["patient_info"].patient_name
@@ -195,158 +320,119 @@ class MedicalSchedulerApp:
     
     def _handle_insurance(self, user_input: str) -> str:
         """Handle insurance information collection"""
+        from models import INSURANCE_INFO_ADAPTER
         try:
-            response, is_complete, data = self.insurance_agent.process_input(user_input)
-            
-            if is_complete:
-                # Convert to InsuranceInfo model
-                from models import InsuranceInfo
+            if user_input.lstrip().startswith('{'):
+                # Whole insurance form submitted as JSON - validate it in one parse
                 try:
-                    insurance_info = InsuranceInfo(**data)
-                    self.state["insurance_info"] = insurance_info
-                    
-                    # Update patient record with insurance information
-                    if self.state.get("lookup_result"):
-                        patient_id = self.state["lookup_result"].patient_id
-                        insurance_data = {
-                            'primary_carrier': insurance_info.primary_carrier,
-                            'member_id': insurance_info.member_id,
-                            'group_number': insurance_info.group_number
-                        }
-                        self.lookup_agent.update_patient_insurance_info(patient_id, insurance_data)
-                    
-                    # Complete the booking process
-                    return self._complete_booking()
-                    
+                    insurance_info = INSURANCE_INFO_ADAPTER.validate_json(user_input)
                 except Exception as e:
                     return f"Error processing insurance information: {e}"
             else:
-                return response
+                response, is_complete, data = self.insurance_agent.process_input(user_input)
+                
+                if not is_complete:
+                    return response
+                
+                # Convert to InsuranceInfo model
+                try:
+                    insurance_info = INSURANCE_INFO_ADAPTER.validate_python(data)
+                except Exception as e:
+                    return f"Error processing insurance information: {e}"
+            
+            self.state["insurance_info"] = insurance_info
+            
+            # Update patient record with insurance information
+            if self.state.get("lookup_result"):
+                patient_id = self.state["lookup_result"].patient_id
+                insurance_data = insurance_info.model_dump(
+                    include={'primary_carrier', 'member_id', 'group_number'}
+                )
+                self.lookup_agent.update_patient_insurance_info(patient_id, insurance_data)
+            
+            # Complete the booking process
+            return self._complete_booking()
                 
         except Exception as e:
             return f"Error collecting insurance information: {e}"
     
     def _complete_booking(self) -> str:
         """Complete the entire booking process"""
+        from agents.reminder_agent import ReminderAppointment, ReminderPatient, ReminderSlot
         try:
+            patient_info = self._patient_data()
+            insurance_info = self.state["insurance_info"]
+            selected_slot = self.state["selected_slot"]
+            lookup_result = self.state["lookup_result"]
+            
             # 1. Confirm appointment
-            appointment_data = {
-                'date': self.state["selected_slot"].date,
-                'time': self.state["selected_slot"].time,
-                'doctor': self.state["selected_slot"].doctor,
-                'location': self.state["selected_slot"].location
-            }
+            # One slot dict serves as both the appointment data and the selected slot
+            slot_data = selected_slot.model_dump()
+            
+            patient_data = {key: patient_info[key] for key in ('patient_name', 'email', 'phone', 'date_of_birth')}
+            patient_data['patient_id'] = lookup_result.patient_id
             
             response, success, confirmation_record = self.confirmation_agent.confirm_appointment(
-                appointment_data,
-                {
-                    'patient_name': self.state["patient_info"].patient_name,
-                    'email': self.state["patient_info"].email,
-                    'phone': self.state["patient_info"].phone,
-                    'date_of_birth': self.state["patient_info"].date_of_birth,
-                    'patient_id': self.state["lookup_result"].patient_id
-                },
-                {
-                    'primary_carrier': self.state["insurance_info"].primary_carrier,
-                    'member_id': self.state["insurance_info"].member_id,
-                    'group_number': self.state["insurance_info"].group_number
-                },
-                {
-                    'date': self.state["selected_slot"].date,
-                    'time': self.state["selected_slot"].time,
-                    'doctor': self.state["selected_slot"].doctor,
-                    'location': self.state["selected_slot"].location,
-                    'duration_available': self.state["selected_slot"].duration_available
-                },
-                self.state["lookup_result"].patient_type
+                slot_data,
+                patient_data,
+                insurance_info.model_dump(include={'primary_carrier', 'member_id', 'group_number'}),
+                slot_data,
+                lookup_result.patient_type
             )
             
             if not success:
                 return f"❌ Appointment confirmation failed: {response}"
             
-            # 2. Update doctor's schedule (mark slot as booked)
-            patient_type = self.state["lookup_result"].patient_type if self.state.get("lookup_result") else "new"
-            schedule_updated = self.scheduling_agent.update_doctor_schedule(
-                self.state["selected_slot"], 
-                patient_type
+            patient_type = lookup_result.patient_type if lookup_result else "new"
+            
+            # Reminders need an appointment-shaped object
+            mock_appointment = ReminderAppointment(
+                ReminderPatient(patient_info['patient_name'], patient_info['email'], patient_info['phone']),
+                ReminderSlot(slot_data['date'], slot_data['time'], slot_data['doctor'], slot_data['location'])
             )
             
+            # 2-6. Schedule update, Excel export, forms, reminders and patient status
+            # are independent of each other, so run them concurrently
+            (
+                schedule_updated,
+                (export_response, export_success),
+                (form_response, form_success),
+                reminders,
+                patient_status_updated
+            ) = self._run_post_confirmation_steps(confirmation_record, patient_type, mock_appointment)
+            
             if not schedule_updated:
                 print("⚠️ Warning: Could not update doctor's schedule")
+            if patient_status_updated is False:
+                print("⚠️ Warning: Could not mark patient as returning")
             
-            # 3. Export to Excel
-            export_response, export_success = self.confirmation_agent.export_to_excel(confirmation_record)
-            
-            # 4. Send forms
-            form_response, form_success = self.form_agent.send_intake_forms(
-                self.state["patient_info"].email,
-                self.state["patient_info"].patient_name,
-                {
-                    'date': self.state["selected_slot"].date,
-                    'time': self.state["selected_slot"].time
-                },
-                patient_type
+            # Update state in one pass
+            self.state.update(
+                final_booking=confirmation_record,
+                excel_exported=export_success,
+                form_sent=form_success,
+                reminders_scheduled=bool(reminders),
+                current_step="completed"
             )
             
-            # 5. Mark new patients as returning (after successful appointment)
-            if self.state.get("lookup_result") and self.state["lookup_result"].patient_type == "new":
-                patient_id = self.state["lookup_result"].patient_id
-                self.lookup_agent.mark_patient_as_returning(patient_id)
-            
-            # 6. Schedule reminders
-            class MockAppointment:
-                def __init__(self, state):
-                    self.patient_info = type('obj', (object,), {
-                        'patient_name': state["patient_info"].patient_name,
-                        'email': state["patient_info"].email,
-                        'phone': state["patient_info"].phone
-                    })()
-                    self.appointment_slot = type('obj', (object,), {
-                        'date': state["selected_slot"].date,
-                        'time': state["selected_slot"].time,
-                        'doctor': state["selected_slot"].doctor,
-                        'location': state["selected_slot"].location
-                    })()
-            
-            mock_appointment = MockAppointment(self.state)
-            reminders = self.reminder_agent.schedule_reminders(mock_appointment)
-            
-            # Update state
-            self.state["final_booking"] = confirmation_record
-            self.state["excel_exported"] = export_success
-            self.state["form_sent"] = form_success
-            self.state["reminders_scheduled"] = True
-            self.state["current_step"] = "completed"
-            
             # Create user-friendly final response (hide technical details)
             patient_type = self.state["lookup_result"].patient_type if self.state.get("lookup_result") else "new"
             duration = 60 if patient_type == "new" else 30
             
             final_response = (
                 f"{response}\n\n"
-                f"**Patient Intake Forms**\n"
-                f"Your intake forms have been sent to your email\n"
-                f"Please complete them before your appointment\n\n"
+                f"{BOOKING_FORMS_NOTE}"
                 f"**Automated Reminders**\n"
                 f" You'll receive {len(reminders)} reminder messages:\n"
-                f"• 24 hours before your appointment\n"
-                f"• 2 hours before (with form completion check)\n"
-                f"• 1 hour before (final confirmation)\n\n"
-                f"**Your Appointment is All Set!**\n\n"
-                f"**Quick Summary:**\n"
-                f"• **Patient**: {self.state['patient_info'].patient_name}\n"
+                f"{BOOKING_REMINDER_SCHEDULE}"
+                f"• **Patient**: {patient_info['patient_name']}\n"
                 f"• **Patient Type**: {patient_type.title()} Patient\n"
-                f"• **Date & Time**: {self.state['selected_slot'].date} at {self.state['selected_slot'].time}\n"
-                f"• **Doctor**: {self.state['selected_slot'].doctor}\n"
-                f"• **Location**: {self.state['selected_slot'].location}\n"
+                f"• **Date & Time**: {selected_slot.date} at {selected_slot.time}\n"
+                f"• **Doctor**: {selected_slot.doctor}\n"
+                f"• **Location**: {selected_slot.location}\n"
                 f"• **Duration**: {duration} minutes\n"
                 f"• **Appointment ID**: {confirmation_record['appointment_id']}\n\n"
-                f"**What's Next?**\n"
-                f"1. Check your email for confirmation details\n"
-                f"2. Complete the intake forms we sent you\n"
-                f"3. Arrive 15 minutes early for check-in\n\n"
-                f"**Need to make changes?** Contact our office with your Appointment ID.\n\n"
-                f"Thank you for choosing our medical practice! 🏥"
+                f"{BOOKING_NEXT_STEPS}"
             )
             
             print(f"✅ Appointment confirmed: {confirmation_record['appointment_id']}")
@@ -360,8 +446,60 @@ class MedicalSchedulerApp:
         except Exception as e:
             return f"Error completing booking: {e}"
     
+    def _run_post_confirmation_steps(self, confirmation_record: Dict[str, Any], patient_type: str, mock_appointment) -> tuple:
+        """Run the post-confirmation agent calls concurrently on worker threads.
+        
+        Returns (schedule_updated, export result, form result, reminders, patient_status_updated);
+        patient_status_updated is None when the patient was not new and nothing was marked.
+        """
+        with ThreadPoolExecutor(max_workers=5) as executor:
+            # 2. Update doctor's schedule (mark slot as booked)
+            schedule_future = executor.submit(
+                self.scheduling_agent.update_doctor_schedule,
+                self.state["selected_slot"],
+                patient_type
+            )
+            # 3. Export to Excel
+            export_future = executor.submit(self.confirmation_agent.export_to_excel, confirmation_record)
+            # 4. Send forms
+            form_future = executor.submit(
+                self.form_agent.send_intake_forms,
+                self.state["patient_info_dict"]['email'],
+                self.state["patient_info_dict"]['patient_name'],
+                # Reuse the slot dict dumped once for confirmation
+                confirmation_record['appointment_slot'],
+                patient_type
+            )
+            # 6. Schedule reminders
+            reminders_future = executor.submit(self.reminder_agent.schedule_reminders, mock_appointment)
+            
+            # 5. Mark new patients as returning (after successful appointment)
+            status_future = None
+            if self.state.get("lookup_result") and self.state["lookup_result"].patient_type == "new":
+                status_future = executor.submit(
+                    self.lookup_agent.mark_patient_as_returning,
+                    self.state["lookup_result"].patient_id
+                )
+            
+            return (
+                schedule_future.result(),
+                export_future.result(),
+                form_future.result(),
+                reminders_future.result(),
+                status_future.result() if status_future else None
+            )
+    
     def get_state_summary(self) -> Dict[str, Any]:
-        """Get current state summary"""
+        """Get current state summary (cached until the next state mutation)"""
+        if self._summary_cache is not None and self._summary_cache[0] == self._state_version:
+            return self._summary_cache[1]
+        
+        summary = self._build_state_summary()
+        self._summary_cache = (self._state_version, summary)
+        return summary
+    
+    def _build_state_summary(self) -> Dict[str, Any]:
+        """Build the state summary dict from the current state"""
         patient_info = self.state.get('patient_info')
         return {
             'current_step': self.state.get('current_step'),
@@ -1,6 +1,6 @@
-from .patients_models import PatientInfo, PatientLookupResult
-from .appointment_models import AppointmentSlot, AppointmentBooking
-from .insurance_models import InsuranceInfo
+from .patients_models import PatientInfo, PatientLookupResult, PATIENT_INFO_ADAPTER
+from .appointment_models import AppointmentSlot, AppointmentBooking, APPOINTMENT_SLOTS_ADAPTER
+from .insurance_models import InsuranceInfo, INSURANCE_INFO_ADAPTER
 
 # Resolve forward references
 AppointmentBooking.model_rebuild()
@@ -10,5 +10,8 @@ __all__ = [
     "PatientLookupResult", 
     "AppointmentSlot",
     "AppointmentBooking",
-    "InsuranceInfo"
+    "InsuranceInfo",
+    "PATIENT_INFO_ADAPTER",
+    "APPOINTMENT_SLOTS_ADAPTER",
+    "INSURANCE_INFO_ADAPTER"
 ]
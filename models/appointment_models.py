@@ -1,10 +1,13 @@
-from pydantic import BaseModel, Field, field_validator
-from typing import Optional, Literal
+from pydantic import BaseModel, Field, TypeAdapter, computed_field, field_validator, model_validator
+from typing import Optional, Literal, List
 from datetime import datetime, date, time
 import re
+from time import time_ns
 from .patients_models import PatientInfo, PatientLookupResult
 from .insurance_models import InsuranceInfo
 
+APPOINTMENT_ID_RE = re.compile(r'^APT_\d{8}_\d{3}$')
+
 class AppointmentSlot(BaseModel):
     """Available appointment slot"""
     
@@ -18,6 +21,9 @@ class AppointmentSlot(BaseModel):
     def validate_future_date(cls, v):
         return v
 
+# Validates a whole list of slot records in one pydantic-core call
+APPOINTMENT_SLOTS_ADAPTER = TypeAdapter(List[AppointmentSlot])
+
 class AppointmentBooking(BaseModel):
     """Complete appointment booking record"""
     
@@ -27,13 +33,32 @@ class AppointmentBooking(BaseModel):
     insurance_info: 'InsuranceInfo'
     
     status: Literal["confirmed", "pending", "cancelled"] = "confirmed"
-    created_at: datetime = Field(default_factory=datetime.now)
+    # Integer stamp is far cheaper to take than a datetime; created_at derives from it
+    created_at_ns: int = Field(default_factory=time_ns)
     form_sent: bool = False
     reminders_sent: int = Field(default=0, ge=0, le=3)
     
+    @model_validator(mode='before')
+    @classmethod
+    def accept_created_at(cls, data):
+        """Keep created_at=... (datetime or ISO string) working as an input"""
+        if isinstance(data, dict) and 'created_at' in data:
+            data = dict(data)
+            created_at = data.pop('created_at')
+            # An explicit created_at_ns (e.g. from model_dump) wins over the derived field
+            if created_at is not None and 'created_at_ns' not in data:
+                if isinstance(created_at, str):
+                    created_at = datetime.fromisoformat(created_at)
+                data['created_at_ns'] = round(created_at.timestamp() * 1_000_000) * 1000
+        return data
+    
+    @computed_field
+    @property
+    def created_at(self) -> datetime:
+        return datetime.fromtimestamp(self.created_at_ns / 1e9)
+    
     @field_validator('appointment_id')
     def validate_appointment_id_format(cls, v):
-        pattern = r'^APT_\d{8}_\d{3}$'
-        if not re.match(pattern, v):
+        if not APPOINTMENT_ID_RE.match(v):
             raise ValueError('Invalid appointment ID format')
         return v
@@ -1,6 +1,9 @@
-from pydantic import BaseModel, Field, field_validator
+from pydantic import BaseModel, Field, TypeAdapter, field_validator
 from typing import Optional
 
+# Drops spaces and dashes in a single pass
+ID_SEPARATOR_TABLE = str.maketrans('', '', ' -')
+
 class InsuranceInfo(BaseModel):
     """Insurance information with validation"""
     
@@ -14,21 +17,26 @@ class InsuranceInfo(BaseModel):
     
     @field_validator('member_id', 'secondary_member_id')
     def validate_member_id(cls, v):
-        if v is None:
+        # Already-clean input (the usual case) needs no new string
+        if v is None or v.isalnum():
             return v
-        clean_id = v.replace(' ', '').replace('-', '')
+        clean_id = v.translate(ID_SEPARATOR_TABLE)
         if not clean_id.isalnum():
             raise ValueError('Member ID must contain only letters and numbers')
         return clean_id
     
     @field_validator('group_number', 'secondary_group_number')
     def validate_group_number(cls, v):
-        if v is None:
+        # Already-clean input (the usual case) needs no new string
+        if v is None or v.isalnum():
             return v
-        clean_group = v.replace(' ', '').replace('-', '')
+        clean_group = v.translate(ID_SEPARATOR_TABLE)
         if not clean_group.isalnum():
             raise ValueError('Group number must contain only letters and numbers')
         return clean_group
     
     class Config:
         str_strip_whitespace = True
+
+# Reusable validator for dict input, built once instead of per call
+INSURANCE_INFO_ADAPTER = TypeAdapter(InsuranceInfo)
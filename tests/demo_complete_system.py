@@ -6,6 +6,7 @@ with working Excel export
 
 import sys
 import os
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
 # Add project root to path
@@ -21,7 +22,7 @@ def demo_complete_workflow():
     try:
         from agents.confirmation_agent import ConfirmationAgent
         from agents.form_distribution import FormDistributionAgent
-        from agents.reminder_agent import ReminderAgent
+        from agents.reminder_agent import ReminderAgent, ReminderAppointment, ReminderPatient, ReminderSlot
         from utils.excel_export import ExcelExportService
         print("✅ All agents imported successfully")
     except Exception as e:
@@ -91,9 +92,31 @@ def demo_complete_workflow():
     print("✅ Appointment confirmed successfully")
     print(f"   Appointment ID: {confirmation_record['appointment_id']}")
     
+    # The form send only touches the notification channel, so it overlaps the export.
+    # The admin report (step 8) is written after the export, which also rewrites it.
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        export_future = executor.submit(confirmation_agent.export_to_excel, confirmation_record)
+        form_future = executor.submit(
+            form_agent.send_intake_forms,
+            patient_info['email'],
+            patient_info['patient_name'],
+            appointment_data,
+            "new"  # Assuming new patient for 60-minute appointment
+        )
+        
+        # Step 7: Schedule reminders (in-memory, runs while the others work)
+        # Create a mock appointment object for reminder scheduling
+        patient = confirmation_record['patient_info']
+        slot = confirmation_record['appointment_slot']
+        mock_appointment = ReminderAppointment(
+            ReminderPatient(patient['patient_name'], patient['email'], patient['phone']),
+            ReminderSlot(slot['date'], slot['time'], slot['doctor'], slot['location'])
+        )
+        reminders = reminder_agent.schedule_reminders(mock_appointment)
+    
     # Step 5: Export to Excel
     print("\n🔄 Step 2: Exporting to Excel...")
-    export_response, export_success = confirmation_agent.export_to_excel(confirmation_record)
+    export_response, export_success = export_future.result()
     
     if not export_success:
         print(f"❌ Excel export failed: {export_response}")
@@ -103,12 +126,7 @@ def demo_complete_workflow():
     
     # Step 6: Send intake forms
     print("\n🔄 Step 3: Sending Intake Forms...")
-    form_response, form_success = form_agent.send_intake_forms(
-        patient_info['email'],
-        patient_info['patient_name'],
-        appointment_data,
-        "new"  # Assuming new patient for 60-minute appointment
-    )
+    form_response, form_success = form_future.result()
     
     if not form_success:
         print(f"❌ Form distribution failed: {form_response}")
@@ -118,25 +136,6 @@ def demo_complete_workflow():
     
     # Step 7: Schedule reminders
     print("\n🔄 Step 4: Scheduling Reminders...")
-    
-    # Create a mock appointment object for reminder scheduling
-    class MockAppointment:
-        def __init__(self, confirmation_record):
-            self.patient_info = type('obj', (object,), {
-                'patient_name': confirmation_record['patient_info']['patient_name'],
-                'email': confirmation_record['patient_info']['email'],
-                'phone': confirmation_record['patient_info']['phone']
-            })()
-            self.appointment_slot = type('obj', (object,), {
-                'date': confirmation_record['appointment_slot']['date'],
-                'time': confirmation_record['appointment_slot']['time'],
-                'doctor': confirmation_record['appointment_slot']['doctor'],
-                'location': confirmation_record['appointment_slot']['location']
-            })()
-    
-    mock_appointment = MockAppointment(confirmation_record)
-    reminders = reminder_agent.schedule_reminders(mock_appointment)
-    
     print(f"✅ {len(reminders)} reminders scheduled")
     
     # Step 8: Generate admin report
@@ -149,34 +148,35 @@ def demo_complete_workflow():
     
     print("✅ Admin report generated successfully")
     
-    # Step 9: Show summary
-    print("\n📊 WORKFLOW SUMMARY")
-    print("=" * 60)
-    print("✅ Patient greeting and information collection")
-    print("✅ Patient database lookup")
-    print("✅ Appointment slot scheduling")
-    print("✅ Insurance information collection")
-    print("✅ Appointment confirmation")
-    print("✅ Excel export for admin review")
-    print("✅ Patient intake form distribution")
-    print("✅ Automated reminder system setup")
-    print("✅ Admin review report generation")
-    
-    print(f"\n📁 Files Generated:")
-    print(f"   • data/appointments.xlsx - Individual appointment records")
-    print(f"   • data/admin_review_report.xlsx - Administrative summary")
-    
-    print(f"\n📧 Communications Sent (Mock Mode):")
-    print(f"   • Appointment confirmation email to {patient_info['email']}")
-    print(f"   • Appointment confirmation SMS to {patient_info['phone']}")
-    print(f"   • Patient intake form email to {patient_info['email']}")
-    
-    print(f"\n⏰ Reminders Scheduled:")
-    for i, (reminder_key, reminder_data) in enumerate(reminders.items(), 1):
-        print(f"   • Reminder {i}: {reminder_data['type']} - {reminder_data['action_required']}")
-    
-    print(f"\n🎉 Complete medical appointment booking workflow demonstrated successfully!")
-    print(f"   All assignment requirements have been implemented and tested.")
+    # Step 9: Show summary (built up and written in one go)
+    summary_lines = [
+        "\n📊 WORKFLOW SUMMARY",
+        "=" * 60,
+        "✅ Patient greeting and information collection",
+        "✅ Patient database lookup",
+        "✅ Appointment slot scheduling",
+        "✅ Insurance information collection",
+        "✅ Appointment confirmation",
+        "✅ Excel export for admin review",
+        "✅ Patient intake form distribution",
+        "✅ Automated reminder system setup",
+        "✅ Admin review report generation",
+        "\n📁 Files Generated:",
+        "   • data/appointments.xlsx - Individual appointment records",
+        "   • data/admin_review_report.xlsx - Administrative summary",
+        "\n📧 Communications Sent (Mock Mode):",
+        f"   • Appointment confirmation email to {patient_info['email']}",
+        f"   • Appointment confirmation SMS to {patient_info['phone']}",
+        f"   • Patient intake form email to {patient_info['email']}",
+        "\n⏰ Reminders Scheduled:",
+    ]
+    summary_lines.extend(
+        f"   • Reminder {i}: {reminder_data['type']} - {reminder_data['action_required']}"
+        for i, reminder_data in enumerate(reminders.values(), 1)
+    )
+    summary_lines.append("\n🎉 Complete medical appointment booking workflow demonstrated successfully!")
+    summary_lines.append("   All assignment requirements have been implemented and tested.")
+    print(*summary_lines, sep="\n")
     
     return True
 
@@ -186,44 +186,49 @@ def verify_excel_data():
     print("\n🔍 Verifying Excel Data...")
     
     try:
-        import pandas as pd
+        from collections import deque
+        from utils.data_loader import iter_excel_rows
         
         # Check appointments file
         appointments_file = "data/appointments.xlsx"
-        if os.path.exists(appointments_file):
-            df = pd.read_excel(appointments_file)
+        
+        # Open directly; a missing file just means there is nothing to verify
+        rows = iter_excel_rows(appointments_file)
+        try:
+            header = next(rows, None)
+        except FileNotFoundError:
+            header = None
+        last_row = deque(rows, maxlen=1)
+        
+        # Find the most recent appointment (last row)
+        if header and last_row:
+            latest_appointment = dict(zip(header, last_row[0]))
             
-            # Find the most recent appointment (last row)
-            if len(df) > 0:
-                latest_appointment = df.iloc[-1]
-                
-                print(f"✅ Latest appointment in Excel:")
-                print(f"   ID: {latest_appointment['appointment_id']}")
-                print(f"   Patient: {latest_appointment['patient_name']}")
-                print(f"   Doctor: {latest_appointment['doctor']}")
-                print(f"   Location: {latest_appointment['location']}")
-                print(f"   Date: {latest_appointment['appointment_date']}")
-                print(f"   Time: {latest_appointment['appointment_time']}")
-                print(f"   Insurance: {latest_appointment['insurance_carrier']}")
-                
-                # Check for missing data
-                missing_fields = []
-                important_fields = ['patient_name', 'doctor', 'location', 'appointment_date', 'appointment_time', 'insurance_carrier']
-                
-                for field in important_fields:
-                    if pd.isna(latest_appointment[field]) or latest_appointment[field] == '':
-                        missing_fields.append(field)
+            print(f"✅ Latest appointment in Excel:")
+            print(f"   ID: {latest_appointment['appointment_id']}")
+            print(f"   Patient: {latest_appointment['patient_name']}")
+            print(f"   Doctor: {latest_appointment['doctor']}")
+            print(f"   Location: {latest_appointment['location']}")
+            print(f"   Date: {latest_appointment['appointment_date']}")
+            print(f"   Time: {latest_appointment['appointment_time']}")
+            print(f"   Insurance: {latest_appointment['insurance_carrier']}")
+            
+            # Check for missing data
+            important_fields = ['patient_name', 'doctor', 'location', 'appointment_date', 'appointment_time', 'insurance_carrier']
+            missing_fields = [field for field in important_fields if latest_appointment[field] in (None, '')]
+            
+            if missing_fields:
+                print(f"⚠️  Missing data in fields: {missing_fields}")
+            else:
+                print("✅ All important fields have data")
                 
-                if missing_fields:
-                    print(f"⚠️  Missing data in fields: {missing_fields}")
-                else:
-                    print("✅ All important fields have data")
-                    
         # Check admin report
         admin_file = "data/admin_review_report.xlsx"
-        if os.path.exists(admin_file):
-            admin_df = pd.read_excel(admin_file)
-            print(f"✅ Admin report contains {len(admin_df)} metrics")
+        try:
+            metrics = sum(1 for _ in iter_excel_rows(admin_file)) - 1
+            print(f"✅ Admin report contains {max(metrics, 0)} metrics")
+        except FileNotFoundError:
+            pass
             
     except Exception as e:
         print(f"❌ Error verifying Excel data: {e}")
@@ -238,20 +243,22 @@ if __name__ == "__main__":
         # Verify the Excel data
         verify_excel_data()
         
-        print("\n" + "=" * 60)
-        print("🎯 ASSIGNMENT REQUIREMENTS VERIFICATION")
-        print("=" * 60)
-        print("✅ Patient Greeting - Collect name, DOB, doctor, location")
-        print("✅ Patient Lookup - Search EMR, detect new vs returning")
-        print("✅ Smart Scheduling - 60min (new) vs 30min (returning)")
-        print("✅ Calendar Integration - Show available slots")
-        print("✅ Insurance Collection - Capture carrier, member ID, group")
-        print("✅ Appointment Confirmation - Export to Excel, send confirmations")
-        print("✅ Form Distribution - Email patient intake forms")
-        print("✅ Reminder System - 3 automated reminders with actions")
-        print("✅ Excel Export - Working properly with all data fields")
-        print("✅ Admin Review Reports - Generated successfully")
-        
-        print(f"\n🏆 ALL ASSIGNMENT REQUIREMENTS COMPLETED SUCCESSFULLY!")
+        print(
+            "\n" + "=" * 60,
+            "🎯 ASSIGNMENT REQUIREMENTS VERIFICATION",
+            "=" * 60,
+            "✅ Patient Greeting - Collect name, DOB, doctor, location",
+            "✅ Patient Lookup - Search EMR, detect new vs returning",
+            "✅ Smart Scheduling - 60min (new) vs 30min (returning)",
+            "✅ Calendar Integration - Show available slots",
+            "✅ Insurance Collection - Capture carrier, member ID, group",
+            "✅ Appointment Confirmation - Export to Excel, send confirmations",
+            "✅ Form Distribution - Email patient intake forms",
+            "✅ Reminder System - 3 automated reminders with actions",
+            "✅ Excel Export - Working properly with all data fields",
+            "✅ Admin Review Reports - Generated successfully",
+            "\n🏆 ALL ASSIGNMENT REQUIREMENTS COMPLETED SUCCESSFULLY!",
+            sep="\n"
+        )
     else:
         print("\n❌ Demo failed. Please check the error messages above.")
\ No newline at end of file
@@ -3,8 +3,16 @@
 Script to examine the Excel file content and identify the data mapping issue
 """
 
-import pandas as pd
-import os
+import sys
+
+# Add project root to path
+sys.path.append('.')
+
+from utils.data_loader import iter_excel_rows, load_excel
+
+def _format_row(columns, row):
+    """Render one row as 'column: value (type)' lines for a single write"""
+    return "\n".join(f"  {col}: {value} (type: {type(value)})" for col, value in zip(columns, row))
 
 def examine_excel_files():
     """Examine the Excel files to understand the data structure"""
@@ -13,43 +21,48 @@ def examine_excel_files():
     
     # Check appointments.xlsx
     appointments_file = "data/appointments.xlsx"
-    if os.path.exists(appointments_file):
+    # Open directly and treat a missing file as the error case (no separate exists() stat)
+    try:
+        # Stream the sheet; only the header, first and last rows are kept
+        rows = iter_excel_rows(appointments_file)
+        columns = list(next(rows, ()))
+        first_row = last_row = None
+        row_count = 0
+        for row in rows:
+            if first_row is None:
+                first_row = row
+            last_row = row
+            row_count += 1
+        
         print(f"📊 Examining {appointments_file}")
-        try:
-            df = pd.read_excel(appointments_file)
-            print(f"Rows: {len(df)}")
-            print(f"Columns: {list(df.columns)}")
-            print("\nFirst row data:")
-            if len(df) > 0:
-                for col in df.columns:
-                    value = df.iloc[0][col]
-                    print(f"  {col}: {value} (type: {type(value)})")
-            
-            print("\nLast row data:")
-            if len(df) > 1:
-                for col in df.columns:
-                    value = df.iloc[-1][col]
-                    print(f"  {col}: {value} (type: {type(value)})")
-                    
-        except Exception as e:
-            print(f"Error reading {appointments_file}: {e}")
-    else:
+        print(f"Rows: {row_count}")
+        print(f"Columns: {columns}")
+        print("\nFirst row data:")
+        if first_row is not None:
+            print(_format_row(columns, first_row))
+        
+        print("\nLast row data:")
+        if row_count > 1:
+            print(_format_row(columns, last_row))
+                
+    except FileNotFoundError:
         print(f"❌ {appointments_file} does not exist")
+    except Exception as e:
+        print(f"Error reading {appointments_file}: {e}")
     
     # Check admin_review_report.xlsx
     admin_file = "data/admin_review_report.xlsx"
-    if os.path.exists(admin_file):
+    try:
+        df = load_excel(admin_file)
         print(f"\n📊 Examining {admin_file}")
-        try:
-            df = pd.read_excel(admin_file)
-            print(f"Rows: {len(df)}")
-            print(f"Columns: {list(df.columns)}")
-            print("\nSample data:")
-            print(df.head())
-        except Exception as e:
-            print(f"Error reading {admin_file}: {e}")
-    else:
+        print(f"Rows: {len(df)}")
+        print(f"Columns: {list(df.columns)}")
+        print("\nSample data:")
+        print(df.head())
+    except FileNotFoundError:
         print(f"❌ {admin_file} does not exist")
+    except Exception as e:
+        print(f"Error reading {admin_file}: {e}")
 
 if __name__ == "__main__":
     examine_excel_files()
\ No newline at end of file
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""Test that AppointmentBooking still accepts created_at as an input"""
+
+import sys
+from datetime import datetime, timedelta
+sys.path.append('.')
+
+from models import AppointmentBooking
+
+BOOKING_DATA = {
+    'appointment_id': 'APT_20250903_001',
+    'patient_info': {
+        'patient_name': 'John Smith',
+        'date_of_birth': '12/25/1990',
+        'preferred_doctor': 'Dr. Naveen',
+        'location': 'Gachibowli',
+        'phone': '5551234567',
+        'email': 'john.smith@test.com'
+    },
+    'appointment_slot': {
+        'doctor': 'Dr. Naveen',
+        'location': 'Gachibowli',
+        'date': '2025-01-15',
+        'time': '14:00',
+        'duration_available': 60
+    },
+    'insurance_info': {
+        'primary_carrier': 'Aetna',
+        'member_id': 'AT987654321',
+        'group_number': 'GRP002'
+    }
+}
+
+def test_created_at_input_is_kept():
+    """created_at passed in (datetime or ISO string) is what the model reports back"""
+    created_at = datetime(2025, 1, 10, 9, 30, 15, 123456)
+    
+    for value in (created_at, created_at.isoformat()):
+        booking = AppointmentBooking(**BOOKING_DATA, created_at=value)
+        assert booking.created_at == created_at
+    
+    # model_dump output validates back to the same timestamp
+    dumped = AppointmentBooking(**BOOKING_DATA, created_at=created_at).model_dump()
+    assert AppointmentBooking(**dumped).created_at == created_at
+
+def test_created_at_defaults_to_now():
+    """Without created_at the booking is stamped at construction time"""
+    before = datetime.now()
+    booking = AppointmentBooking(**BOOKING_DATA)
+    # Allow for float rounding when the nanosecond stamp is turned into a datetime
+    slack = timedelta(milliseconds=1)
+    assert before - slack <= booking.created_at <= datetime.now() + slack
+
+if __name__ == "__main__":
+    test_created_at_input_is_kept()
+    test_created_at_defaults_to_now()
+    print("✅ AppointmentBooking created_at tests passed")
@@ -2,6 +2,7 @@
 """Test that confirmation agent uses the correct patient ID"""
 
 import sys
+import os
 sys.path.append('.')
 
 def test_confirmation_patient_id():
@@ -85,8 +86,9 @@ def test_confirmation_patient_id():
         
     except Exception as e:
         print(f"❌ Error: {e}")
-        import traceback
-        traceback.print_exc()
+        if os.getenv("VERBOSE_TRACEBACK"):
+            import traceback
+            traceback.print_exc()
         return False
 
 if __name__ == "__main__":
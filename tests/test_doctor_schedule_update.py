@@ -2,33 +2,41 @@
 """Test that doctor schedule gets updated after appointment booking"""
 
 import sys
+import os
+import shutil
+import tempfile
+from functools import lru_cache
 sys.path.append('.')
 
+from models.appointment_models import AppointmentSlot
+
+@lru_cache(maxsize=1)
+def _scheduling_agent():
+    """One SchedulingAgent shared by both tests"""
+    from agents.scheduling_agent import SchedulingAgent
+    return SchedulingAgent()
+
 def test_doctor_schedule_update():
     print("🧪 Testing Doctor Schedule Update After Appointment...\n")
     
     try:
-        from agents.scheduling_agent import SchedulingAgent
-        from models.appointment_models import AppointmentSlot
-        import pandas as pd
-        
         # Create scheduling agent
-        scheduling_agent = SchedulingAgent()
+        scheduling_agent = _scheduling_agent()
         
         # Check initial schedule
         print("1. Checking initial doctor schedule...")
-        initial_df = pd.read_excel("data/doctors_schedule.xlsx")
-        available_slots_before = len(initial_df[initial_df['available'] == True])
+        initial_df = scheduling_agent.schedule_df.copy()
+        available_slots_before = int(initial_df['available'].sum())
         print(f"Available slots before booking: {available_slots_before}")
         
         # Find an available slot
-        available_mask = initial_df['available'] == True
+        available_mask = initial_df['available'].to_numpy(dtype=bool)
         if not available_mask.any():
             print("❌ No available slots found for testing")
             return False
         
         # Get first available slot
-        first_available = initial_df[available_mask].iloc[0]
+        first_available = initial_df.iloc[available_mask.argmax()]
         print(f"Testing with slot: {first_available['doctor']} - {first_available['date']} {first_available['time']}")
         
         # Create AppointmentSlot object
@@ -47,19 +55,13 @@ def test_doctor_schedule_update():
         if success:
             print("✅ Schedule update method executed successfully")
             
-            # Check if schedule was actually updated
-            updated_df = pd.read_excel("data/doctors_schedule.xlsx")
+            # Check the agent's in-memory schedule, which the booking just updated
+            updated_df = scheduling_agent.schedule_df
             
             # Find the slot we just booked
-            slot_mask = (
-                (updated_df['doctor'] == test_slot.doctor) &
-                (updated_df['location'] == test_slot.location) &
-                (updated_df['date'] == test_slot.date) &
-                (updated_df['time'] == test_slot.time)
-            )
+            updated_slot = scheduling_agent.find_slot_row(test_slot)
             
-            if slot_mask.any():
-                updated_slot = updated_df[slot_mask].iloc[0]
+            if updated_slot is not None:
                 print(f"Updated slot details:")
                 print(f"  Available: {updated_slot['available']}")
                 print(f"  Duration Available: {updated_slot['duration_available']}")
@@ -69,7 +71,7 @@ def test_doctor_schedule_update():
                     print("✅ Slot correctly marked as fully booked for new patient")
                     
                     # Count available slots after booking
-                    available_slots_after = len(updated_df[updated_df['available'] == True])
+                    available_slots_after = int(updated_df['available'].sum())
                     print(f"Available slots after booking: {available_slots_after}")
                     
                     if available_slots_after < available_slots_before:
@@ -92,8 +94,9 @@ def test_doctor_schedule_update():
         
     except Exception as e:
         print(f"❌ Error: {e}")
-        import traceback
-        traceback.print_exc()
+        if os.getenv("VERBOSE_TRACEBACK"):
+            import traceback
+            traceback.print_exc()
         return False
 
 def test_returning_patient_booking():
@@ -101,21 +104,18 @@ def test_returning_patient_booking():
     print("\n🧪 Testing Returning Patient Booking (30 minutes)...\n")
     
     try:
-        from agents.scheduling_agent import SchedulingAgent
-        from models.appointment_models import AppointmentSlot
-        import pandas as pd
-        
-        scheduling_agent = SchedulingAgent()
+        scheduling_agent = _scheduling_agent()
         
         # Find a slot with 60+ minutes available
-        df = pd.read_excel("data/doctors_schedule.xlsx")
-        suitable_slots = df[(df['available'] == True) & (df['duration_available'] >= 60)]
+        df = scheduling_agent.schedule_df
+        suitable_mask = df['available'].to_numpy(dtype=bool) & (df['duration_available'].to_numpy() >= 60)
+        first_suitable = suitable_mask.argmax()
         
-        if len(suitable_slots) == 0:
+        if not suitable_mask[first_suitable]:
             print("❌ No suitable slots found for returning patient test")
             return False
         
-        test_slot_data = suitable_slots.iloc[0]
+        test_slot_data = df.iloc[first_suitable]
         original_duration = test_slot_data['duration_available']
         
         test_slot = AppointmentSlot(
@@ -134,16 +134,9 @@ def test_returning_patient_booking():
         
         if success:
             # Check updated schedule
-            updated_df = pd.read_excel("data/doctors_schedule.xlsx")
-            slot_mask = (
-                (updated_df['doctor'] == test_slot.doctor) &
-                (updated_df['location'] == test_slot.location) &
-                (updated_df['date'] == test_slot.date) &
-                (updated_df['time'] == test_slot.time)
-            )
+            updated_slot = scheduling_agent.find_slot_row(test_slot)
             
-            if slot_mask.any():
-                updated_slot = updated_df[slot_mask].iloc[0]
+            if updated_slot is not None:
                 expected_remaining = max(0, original_duration - 30)
                 
                 print(f"Expected remaining duration: {expected_remaining} minutes")
@@ -167,6 +160,147 @@ def test_returning_patient_booking():
         print(f"❌ Error: {e}")
         return False
 
+def _scratch_schedule(directory: str) -> str:
+    """Copy the schedule workbook into a scratch directory so data/ stays untouched"""
+    path = os.path.join(directory, "doctors_schedule.xlsx")
+    shutil.copy("data/doctors_schedule.xlsx", path)
+    return path
+
+def _available_slots(agent, count: int):
+    """The first `count` open slots of an agent's schedule as AppointmentSlots"""
+    df = agent.schedule_df
+    rows = df[df['available'].to_numpy(dtype=bool)].head(count)
+    return [
+        AppointmentSlot(doctor=row['doctor'], location=row['location'], date=row['date'],
+                        time=row['time'], duration_available=int(row['duration_available']))
+        for _, row in rows.iterrows()
+    ]
+
+def test_booking_log_survives_new_agent():
+    """A booking written to the log (not yet compacted) is seen by a freshly loaded agent"""
+    from agents.scheduling_agent import SchedulingAgent
+    
+    with tempfile.TemporaryDirectory() as scratch:
+        path = _scratch_schedule(scratch)
+        first = SchedulingAgent(path)
+        slot = _available_slots(first, 1)[0]
+        assert first.update_doctor_schedule(slot, "returning")
+        assert os.path.exists(first.booking_log_path)
+        
+        # As after a crash before compaction: only the workbook and the log are on disk
+        reloaded = SchedulingAgent(path)
+        assert not reloaded.find_slot_row(slot)['available']
+
+def test_compaction_folds_log_into_workbook():
+    """Compaction writes logged bookings into the .xlsx and removes the log"""
+    from agents.scheduling_agent import SchedulingAgent
+    from utils.data_loader import load_excel
+    
+    with tempfile.TemporaryDirectory() as scratch:
+        path = _scratch_schedule(scratch)
+        agent = SchedulingAgent(path)
+        slot = _available_slots(agent, 1)[0]
+        assert agent.update_doctor_schedule(slot, "returning")
+        
+        agent.compact_booking_log()
+        assert not os.path.exists(agent.booking_log_path)
+        assert not os.path.exists(agent.booking_log_path + ".lock")
+        
+        df = load_excel(path)
+        booked = df[(df['doctor'] == slot.doctor) & (df['location'] == slot.location)
+                    & (df['date'].astype(str) == slot.date) & (df['time'].astype(str) == slot.time)]
+        assert len(booked) == 1 and not booked['available'].iloc[0]
+
+def test_compaction_keeps_other_agents_bookings():
+    """An agent compacting a stale frame must not drop bookings another agent already compacted"""
+    from agents.scheduling_agent import SchedulingAgent
+    
+    with tempfile.TemporaryDirectory() as scratch:
+        path = _scratch_schedule(scratch)
+        first, second = SchedulingAgent(path), SchedulingAgent(path)
+        slot_a, slot_b = _available_slots(first, 2)
+        
+        assert second.update_doctor_schedule(slot_b, "returning")
+        second.compact_booking_log()
+        
+        # first loaded before slot_b was booked and compacted
+        assert first.update_doctor_schedule(slot_a, "returning")
+        first.compact_booking_log()
+        
+        reloaded = SchedulingAgent(path)
+        assert not reloaded.find_slot_row(slot_a)['available']
+        assert not reloaded.find_slot_row(slot_b)['available']
+
+def test_booking_log_row_for_missing_slot():
+    """Logged bookings for slots no longer in the workbook are skipped, not fatal"""
+    from agents.scheduling_agent import SchedulingAgent, BOOKING_LOG_COLUMNS
+    
+    with tempfile.TemporaryDirectory() as scratch:
+        path = _scratch_schedule(scratch)
+        slot = _available_slots(SchedulingAgent(path), 1)[0]
+        
+        log_path = os.path.splitext(path)[0] + "_bookings.csv"
+        with open(log_path, "w") as f:
+            f.write(",".join(BOOKING_LOG_COLUMNS) + "\n")
+            f.write("Dr. Nobody,Nowhere,1999-01-01,03:00,Fully Booked (Returning Patient)\n")
+            f.write(f"{slot.doctor},{slot.location},{slot.date},{slot.time},Fully Booked (Returning Patient)\n")
+        
+        agent = SchedulingAgent(path)
+        assert not agent.find_slot_row(slot)['available']
+        
+        agent.compact_booking_log()
+        assert not os.path.exists(log_path)
+
+def test_booking_log_lock_only_breaks_abandoned_locks():
+    """Old locks of dead owners are broken; fresh or live-owner locks are left alone"""
+    import subprocess
+    import time
+    from agents.scheduling_agent import SchedulingAgent, BOOKING_LOG_LOCK_TIMEOUT, _break_stale_lock
+    
+    with tempfile.TemporaryDirectory() as scratch:
+        agent = SchedulingAgent(_scratch_schedule(scratch))
+        lock_path = agent.booking_log_path + ".lock"
+        old = time.time() - BOOKING_LOG_LOCK_TIMEOUT - 5
+        
+        # A pid that has already exited
+        finished = subprocess.Popen([sys.executable, "-c", "pass"])
+        finished.wait()
+        
+        # Fresh lock of a dead owner: another process may just have created it
+        with open(lock_path, "w") as f:
+            f.write(f"{finished.pid} fresh")
+        _break_stale_lock(lock_path)
+        assert os.path.exists(lock_path)
+        
+        if os.name == "posix":
+            # Old lock whose owner (this process) is alive: a slow holder, not a crash
+            with open(lock_path, "w") as f:
+                f.write(f"{os.getpid()} live")
+            os.utime(lock_path, (old, old))
+            _break_stale_lock(lock_path)
+            assert os.path.exists(lock_path)
+        
+        # Old lock of a dead owner is abandoned; acquiring takes it over and releases cleanly
+        with open(lock_path, "w") as f:
+            f.write(f"{finished.pid} crashed")
+        os.utime(lock_path, (old, old))
+        with agent._booking_log_lock():
+            assert f"{os.getpid()} " in open(lock_path).read()
+        assert not os.path.exists(lock_path)
+        assert [name for name in os.listdir(scratch) if "lock" in name] == []
+
+def test_booking_log_lock_release_keeps_foreign_lock():
+    """A holder whose lock was replaced must not delete the new owner's lock"""
+    from agents.scheduling_agent import SchedulingAgent
+    
+    with tempfile.TemporaryDirectory() as scratch:
+        agent = SchedulingAgent(_scratch_schedule(scratch))
+        lock_path = agent.booking_log_path + ".lock"
+        with agent._booking_log_lock():
+            with open(lock_path, "w") as f:
+                f.write("12345 someone-else")
+        assert open(lock_path).read() == "12345 someone-else"
+
 if __name__ == "__main__":
     print("🚀 Testing Doctor Schedule Update Functionality\n")
     
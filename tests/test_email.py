@@ -44,44 +44,46 @@ def test_real_email():
     print(f"\nSending test email to: {test_email}")
     print(f"With PDF attachment: data/New-Patient-Intake-Form.pdf")
     
-    # Test 1: Send intake forms email with PDF
-    print("\n=== Test 1: Intake Forms Email with PDF ===")
-    success = notification_service.send_intake_forms_email(
-        patient_email=test_email,
-        patient_name=test_name,
-        appointment_date=test_date,
-        appointment_time=test_time,
-        form_path="data/New-Patient-Intake-Form.pdf"
-    )
-    
-    if success:
-        print("✅ Intake forms email sent successfully!")
-    else:
-        print("❌ Failed to send intake forms email")
-        return False
-    
-    # Test 2: Send appointment confirmation
-    print("\n=== Test 2: Appointment Confirmation Email ===")
-    appointment_data = {
-        'date': test_date,
-        'time': test_time,
-        'doctor': 'Dr. Test',
-        'location': 'Test Office',
-        'duration': 60
-    }
-    
-    success = notification_service.send_appointment_confirmation(
-        patient_email=test_email,
-        patient_name=test_name,
-        appointment_data=appointment_data
-    )
-    
-    if success:
-        print("✅ Appointment confirmation email sent successfully!")
-    else:
-        print("❌ Failed to send appointment confirmation email")
-        return False
-    
+    # One SMTP login shared by both sends
+    with notification_service.session():
+        # Test 1: Send intake forms email with PDF
+        print("\n=== Test 1: Intake Forms Email with PDF ===")
+        success = notification_service.send_intake_forms_email(
+            patient_email=test_email,
+            patient_name=test_name,
+            appointment_date=test_date,
+            appointment_time=test_time,
+            form_path="data/New-Patient-Intake-Form.pdf"
+        )
+
+        if success:
+            print("✅ Intake forms email sent successfully!")
+        else:
+            print("❌ Failed to send intake forms email")
+            return False
+
+        # Test 2: Send appointment confirmation
+        print("\n=== Test 2: Appointment Confirmation Email ===")
+        appointment_data = {
+            'date': test_date,
+            'time': test_time,
+            'doctor': 'Dr. Test',
+            'location': 'Test Office',
+            'duration': 60
+        }
+
+        success = notification_service.send_appointment_confirmation(
+            patient_email=test_email,
+            patient_name=test_name,
+            appointment_data=appointment_data
+        )
+
+        if success:
+            print("✅ Appointment confirmation email sent successfully!")
+        else:
+            print("❌ Failed to send appointment confirmation email")
+            return False
+
     print("\n🎉 All email tests passed!")
     print(f"Check your email at: {test_email}")
     return True
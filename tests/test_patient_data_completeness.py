@@ -2,6 +2,7 @@
 """Test that patient data is saved completely with all details"""
 
 import sys
+import os
 sys.path.append('.')
 
 def test_patient_data_completeness():
@@ -108,8 +109,9 @@ def test_patient_data_completeness():
         
     except Exception as e:
         print(f"❌ Error: {e}")
-        import traceback
-        traceback.print_exc()
+        if os.getenv("VERBOSE_TRACEBACK"):
+            import traceback
+            traceback.print_exc()
         return False
 
 if __name__ == "__main__":
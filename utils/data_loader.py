@@ -0,0 +1,117 @@
+import os
+from functools import lru_cache
+from importlib.util import find_spec
+from typing import Optional
+import pandas as pd
+
+# Use the Rust-backed calamine reader when python-calamine is installed
+EXCEL_READ_ENGINE = "calamine" if find_spec("python_calamine") else "openpyxl"
+
+# Parquet sidecars need pyarrow; without it load_excel always parses the workbook
+PARQUET_AVAILABLE = find_spec("pyarrow") is not None
+SIDECAR_SOURCE_KEY = b"source_mtime_ns_size"
+
+def _file_key(path: str):
+    """Identify a file version by its absolute path, mtime and size"""
+    stat = os.stat(path)
+    return os.path.abspath(path), stat.st_mtime_ns, stat.st_size
+
+@lru_cache(maxsize=8)
+def _read_csv(path: str, mtime_ns: int, size: int) -> pd.DataFrame:
+    return pd.read_csv(path)
+
+def _parquet_sidecar(path: str) -> str:
+    """Path of the Parquet copy kept next to an Excel file"""
+    return os.path.splitext(path)[0] + ".parquet"
+
+def _read_sidecar(sidecar: str, source_key: bytes) -> Optional[pd.DataFrame]:
+    """The sidecar's frame if it was built from exactly this workbook version, else None"""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    
+    try:
+        metadata = pq.read_schema(sidecar).metadata or {}
+        if metadata.get(SIDECAR_SOURCE_KEY) != source_key:
+            return None
+        return pq.read_table(sidecar).to_pandas()
+    except (OSError, pa.ArrowException):
+        # Missing or unreadable sidecar: fall back to the workbook
+        return None
+
+def _write_sidecar(df: pd.DataFrame, sidecar: str, source_key: bytes) -> pd.DataFrame:
+    """Write df as a Parquet sidecar tagged with its source version; return the Arrow round trip"""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    
+    try:
+        table = pa.Table.from_pandas(df, preserve_index=False)
+    except pa.ArrowException as e:
+        # e.g. mixed-type columns; this workbook just isn't cached
+        print(f" Parquet cache skipped for {sidecar}: {e}")
+        return df
+    table = table.replace_schema_metadata({**(table.schema.metadata or {}), SIDECAR_SOURCE_KEY: source_key})
+    
+    # Write then rename so concurrent readers never see a partial file
+    tmp_path = f"{sidecar}.{os.getpid()}.tmp"
+    try:
+        pq.write_table(table, tmp_path, compression="snappy")
+        os.replace(tmp_path, sidecar)
+    except OSError as e:
+        print(f" Could not write Parquet cache {sidecar}: {e}")
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    # Hand back the Arrow round trip so hits and misses agree on missing values
+    # (Arrow restores empty object cells as None)
+    return table.to_pandas()
+
+@lru_cache(maxsize=8)
+def _read_excel(path: str, mtime_ns: int, size: int, parquet_cache: bool) -> pd.DataFrame:
+    if not (parquet_cache and PARQUET_AVAILABLE):
+        return pd.read_excel(path, engine=EXCEL_READ_ENGINE)
+    
+    # The .xlsx stays the source of truth; the sidecar is only used when it records
+    # the exact (mtime_ns, size) of the workbook it was built from
+    sidecar = _parquet_sidecar(path)
+    source_key = f"{mtime_ns}:{size}".encode()
+    df = _read_sidecar(sidecar, source_key)
+    if df is not None:
+        return df
+    return _write_sidecar(pd.read_excel(path, engine=EXCEL_READ_ENGINE), sidecar, source_key)
+
+def load_csv(path: str) -> pd.DataFrame:
+    """Load a CSV, reusing the parsed frame until the file changes on disk"""
+    # Callers mutate their frames, so hand out a copy of the cached one
+    return _read_csv(*_file_key(path)).copy()
+
+def load_excel(path: str, parquet_cache: bool = False) -> pd.DataFrame:
+    """Load an Excel sheet, reusing the parsed frame until the file changes on disk
+    
+    parquet_cache keeps a Parquet copy next to the workbook so later processes skip
+    the Excel parse; only worth it for read-mostly files such as the doctor schedule.
+    """
+    return _read_excel(*_file_key(path), parquet_cache).copy()
+
+def iter_excel_rows(path: str):
+    """Stream the first sheet's non-blank rows as value tuples, header first"""
+    from openpyxl import load_workbook
+    
+    # Read-only mode streams cells without building styles or a DataFrame
+    wb = load_workbook(path, read_only=True, data_only=True)
+    try:
+        for row in wb.worksheets[0].iter_rows(values_only=True):
+            if any(cell is not None for cell in row):
+                yield row
+    finally:
+        wb.close()
+
+def save_excel(df: pd.DataFrame, path: str) -> None:
+    """Write a plain (unstyled) sheet through openpyxl's streaming write-only mode"""
+    from openpyxl import Workbook
+    
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("Sheet1")
+    ws.append([str(column) for column in df.columns])
+    # Empty cells go out as None, matching to_excel's blank cells for NaN
+    for row in df.astype(object).where(df.notna(), None).itertuples(index=False, name=None):
+        ws.append(row)
+    wb.save(path)
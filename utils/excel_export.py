@@ -11,10 +11,19 @@ from openpyxl.utils.dataframe import dataframe_to_rows
 # Safe path handling
 try:
     current_dir = Path(__file__).parent
-    sys.path.append(str(current_dir.parent))
+    project_root = str(current_dir.parent)
+    if project_root not in sys.path:
+        sys.path.append(project_root)
 except NameError:
     sys.path.append('..')
 
+THIN_BORDER = Border(
+    left=Side(style='thin'),
+    right=Side(style='thin'),
+    top=Side(style='thin'),
+    bottom=Side(style='thin')
+)
+
 class ExcelExportService:
     """Fixed Excel export service for admin review reports"""
     
@@ -48,22 +57,7 @@ class ExcelExportService:
             # Prepare data for export
             export_row = self._prepare_appointment_row(appointment_data)
             
-            # Load existing data or create new
-            if os.path.exists(self.appointments_file):
-                df = pd.read_excel(self.appointments_file)
-            else:
-                df = pd.DataFrame(columns=self._get_appointment_columns())
-            
-            # Add new appointment data
-            df = pd.concat([df, pd.DataFrame([export_row])], ignore_index=True)
-            
-            # Export to Excel with formatting
-            success = self._export_dataframe_to_excel(
-                df, 
-                self.appointments_file, 
-                "Appointments",
-                "appointment_data"
-            )
+            success = self._write_appointment_rows([export_row])
             
             if success:
                 # Log export
@@ -93,6 +87,87 @@ class ExcelExportService:
             print(f" Error exporting appointment data: {e}")
             return f" Error exporting appointment data: {str(e)}", False
     
+    def export_appointments_batch(self, appointments_data: List[Dict[str, Any]]) -> Tuple[str, bool]:
+        """Export many appointments with a single workbook load and save"""
+        
+        try:
+            export_rows = [self._prepare_appointment_row(appointment) for appointment in appointments_data]
+            if not export_rows:
+                return " No appointments to export.", False
+            
+            success = self._write_appointment_rows(export_rows)
+            
+            if success:
+                for appointment in appointments_data:
+                    self._log_export("appointment_data", appointment.get('appointment_id', 'Unknown'))
+                return f" Exported {len(export_rows)} appointments to {self.appointments_file}", True
+            else:
+                return " Failed to export appointment data to Excel.", False
+                
+        except Exception as e:
+            print(f" Error exporting appointment batch: {e}")
+            return f" Error exporting appointment batch: {str(e)}", False
+    
+    def export_with_admin_report(self, appointments_data: List[Dict[str, Any]]) -> Tuple[str, bool]:
+        """
+        Append appointments and regenerate the admin report over the whole appointments sheet
+        
+        Each record is prepared once, and the sheet's existing rows are read from the same
+        workbook load used for the append. The two workbooks are still saved separately
+        since they are separate deliverables.
+        """
+        
+        try:
+            export_rows = [self._prepare_appointment_row(appointment) for appointment in appointments_data]
+            if not export_rows:
+                return " No appointments to export.", False
+            
+            # Filled with the rows already on the sheet, so the report covers every
+            # appointment, not just this batch
+            existing_rows = []
+            if os.path.exists(self.appointments_file):
+                written = self._append_rows_to_excel(export_rows, self.appointments_file, existing_rows)
+            else:
+                written = self._write_appointment_rows(export_rows)
+            if not written:
+                return " Failed to export appointment data to Excel.", False
+            for appointment in appointments_data:
+                self._log_export("appointment_data", appointment.get('appointment_id', 'Unknown'))
+            
+            all_rows = existing_rows + export_rows
+            success = self._export_dataframe_to_excel(
+                self._summarize_appointment_rows(all_rows),
+                self.admin_report_file,
+                "Admin Review Report",
+                "admin_report"
+            )
+            
+            if success:
+                self._log_export("admin_report", f"{len(all_rows)} appointments")
+                return (
+                    f" Exported {len(export_rows)} appointments to {self.appointments_file} "
+                    f"and updated {self.admin_report_file} ({len(all_rows)} total)"
+                ), True
+            else:
+                return " Failed to generate admin review report.", False
+                
+        except Exception as e:
+            print(f" Error exporting appointments with admin report: {e}")
+            return f" Error exporting appointments with admin report: {str(e)}", False
+    
+    def _write_appointment_rows(self, export_rows: List[Dict[str, Any]]) -> bool:
+        """Append prepared rows to the appointments sheet; only a new file needs a full write"""
+        if os.path.exists(self.appointments_file):
+            return self._append_rows_to_excel(export_rows, self.appointments_file)
+        
+        df = pd.DataFrame(export_rows, columns=self._get_appointment_columns())
+        return self._export_dataframe_to_excel(
+            df,
+            self.appointments_file,
+            "Appointments",
+            "appointment_data"
+        )
+    
     def _extract_patient_name(self, appointment_data: Dict[str, Any]) -> str:
         """Extract patient name from various data structures"""
         # Try direct access first
@@ -233,14 +308,15 @@ class ExcelExportService:
     
     def _prepare_admin_report_data(self, appointments_data: List[Dict[str, Any]]) -> pd.DataFrame:
         """Prepare comprehensive admin report data"""
+        return self._summarize_appointment_rows(
+            [self._prepare_appointment_row(appointment) for appointment in appointments_data]
+        )
+    
+    def _summarize_appointment_rows(self, export_rows: List[Dict[str, Any]]) -> pd.DataFrame:
+        """Build admin summary metrics from already-prepared appointment rows"""
         
         # Convert to DataFrame for easier analysis
-        processed_data = []
-        for appointment in appointments_data:
-            processed_row = self._prepare_appointment_row(appointment)
-            processed_data.append(processed_row)
-        
-        df = pd.DataFrame(processed_data)
+        df = pd.DataFrame(export_rows)
         
         # Create summary statistics
         summary_data = []
@@ -334,31 +410,78 @@ class ExcelExportService:
             print(f" Error exporting to Excel: {e}")
             return False
     
+    def _append_rows_to_excel(self,
+                              rows: List[Dict[str, Any]],
+                              file_path: str,
+                              existing_rows: Optional[List[Dict[str, Any]]] = None) -> bool:
+        """Append rows to an existing sheet, loading and saving the workbook once per batch
+        
+        When existing_rows is given, it is filled with the sheet's current rows as dicts,
+        read from the same load.
+        """
+        
+        try:
+            workbook = openpyxl.load_workbook(file_path)
+            worksheet = workbook.active
+            header = [cell.value for cell in worksheet[1]]
+            
+            if existing_rows is not None:
+                existing_rows.extend(
+                    dict(zip(header, values))
+                    for values in worksheet.iter_rows(min_row=2, values_only=True)
+                    if any(value is not None for value in values)
+                )
+            
+            # Unknown keys become new trailing columns, matching pd.concat behaviour
+            for row in rows:
+                for key in row:
+                    if key not in header:
+                        header.append(key)
+                        self._format_header_cell(worksheet.cell(row=1, column=len(header), value=key))
+            
+            first_new_row = worksheet.max_row + 1
+            for row in rows:
+                worksheet.append([row.get(column) for column in header])
+            
+            # Format just the new rows and widen columns they overflow
+            for new_row in worksheet.iter_rows(min_row=first_new_row):
+                for cell in new_row:
+                    self._format_data_cell(cell)
+                    dimension = worksheet.column_dimensions[cell.column_letter]
+                    wanted_width = min(len(str(cell.value)) + 2, 50)
+                    if dimension.width is None or dimension.width < wanted_width:
+                        dimension.width = wanted_width
+            
+            workbook.save(file_path)
+            return True
+            
+        except Exception as e:
+            print(f" Error appending to Excel: {e}")
+            return False
+    
+    def _format_header_cell(self, cell):
+        """Apply header styling to a single cell"""
+        cell.font = Font(bold=True, color="FFFFFF")
+        cell.fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
+        cell.alignment = Alignment(horizontal="center", vertical="center")
+        cell.border = THIN_BORDER
+    
+    def _format_data_cell(self, cell):
+        """Apply data styling to a single cell"""
+        cell.border = THIN_BORDER
+        cell.alignment = Alignment(horizontal="left", vertical="center")
+    
     def _apply_excel_formatting(self, worksheet, export_type: str):
         """Apply professional Excel formatting"""
         
-        # Define styles
-        header_font = Font(bold=True, color="FFFFFF")
-        header_fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
-        border = Border(
-            left=Side(style='thin'),
-            right=Side(style='thin'),
-            top=Side(style='thin'),
-            bottom=Side(style='thin')
-        )
-        
         # Format header row
         for cell in worksheet[1]:
-            cell.font = header_font
-            cell.fill = header_fill
-            cell.alignment = Alignment(horizontal="center", vertical="center")
-            cell.border = border
+            self._format_header_cell(cell)
         
         # Format data rows
         for row in worksheet.iter_rows(min_row=2):
             for cell in row:
-                cell.border = border
-                cell.alignment = Alignment(horizontal="left", vertical="center")
+                self._format_data_cell(cell)
         
         # Auto-adjust column widths
         for column in worksheet.columns:
@@ -426,6 +549,9 @@ def test_fixed_excel_export():
     
     service = ExcelExportService()
     
+    # One timestamp shared by both fields
+    now_iso = datetime.now().isoformat()
+    
     # Test data with nested structure (like from confirmation agent)
     test_appointment = {
         'appointment_id': 'APT_20250903_FIXED_001',
@@ -449,8 +575,8 @@ def test_fixed_excel_export():
             'group_number': 'GRP003'
         },
         'status': 'confirmed',
-        'confirmed_at': datetime.now().isoformat(),
-        'created_at': datetime.now().isoformat(),
+        'confirmed_at': now_iso,
+        'created_at': now_iso,
         'reminders_sent': 0,
         'form_sent': False
     }
@@ -0,0 +1,91 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import List, Optional
+
+DEFAULT_TTL_SECONDS = 24 * 60 * 60
+DEFAULT_MAX_ENTRIES = 1000
+
+def llm_cache_enabled() -> bool:
+    """Caching is opt-in (LLM_CACHE_ENABLED=1): completions contain patient details"""
+    return os.getenv("LLM_CACHE_ENABLED", "").strip().lower() in ("1", "true", "yes")
+
+class LLMResponseCache:
+    """Persistent on-disk cache of LLM completions keyed on a digest of the prompt
+    
+    Entries expire after ttl_seconds and only the newest max_entries are kept,
+    so patient details in completions are not retained indefinitely.
+    """
+    
+    def __init__(self,
+                 cache_path: Optional[str] = None,
+                 ttl_seconds: Optional[float] = None,
+                 max_entries: Optional[int] = None):
+        self.cache_path = cache_path or os.getenv("LLM_CACHE_PATH", ".llm_cache.sqlite")
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else float(
+            os.getenv("LLM_CACHE_TTL_SECONDS", DEFAULT_TTL_SECONDS)
+        )
+        self.max_entries = max_entries if max_entries is not None else int(
+            os.getenv("LLM_CACHE_MAX_ENTRIES", DEFAULT_MAX_ENTRIES)
+        )
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.cache_path, check_same_thread=False)
+        
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(completions)")}
+        if columns and "created_at" not in columns:
+            # Caches from before expiry existed kept entries forever; drop them
+            self._conn.execute("DROP TABLE completions")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS completions "
+            "(key TEXT PRIMARY KEY, response TEXT NOT NULL, created_at REAL NOT NULL)"
+        )
+        with self._lock:
+            self._purge()
+    
+    @staticmethod
+    def make_key(model_name: str, messages: List) -> str:
+        """Hash the model name and message sequence into a cache key"""
+        payload = json.dumps(
+            [model_name] + [[message.type, message.content] for message in messages],
+            ensure_ascii=False
+        )
+        return hashlib.blake2b(payload.encode('utf-8'), digest_size=16).hexdigest()
+    
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached completion for key, or None on a miss or expired entry"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response FROM completions WHERE key = ? AND created_at >= ?",
+                (key, time.time() - self.ttl_seconds)
+            ).fetchone()
+        return row[0] if row else None
+    
+    def set(self, key: str, response: str):
+        """Store a completion, then drop expired and overflow entries"""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO completions (key, response, created_at) VALUES (?, ?, ?)",
+                (key, response, time.time())
+            )
+            self._purge()
+    
+    def clear(self):
+        """Delete every cached completion"""
+        with self._lock:
+            self._conn.execute("DELETE FROM completions")
+            self._conn.commit()
+    
+    def _purge(self):
+        """Remove expired entries and keep only the newest max_entries (lock held)"""
+        self._conn.execute(
+            "DELETE FROM completions WHERE created_at < ?", (time.time() - self.ttl_seconds,)
+        )
+        self._conn.execute(
+            "DELETE FROM completions WHERE key NOT IN "
+            "(SELECT key FROM completions ORDER BY created_at DESC LIMIT ?)",
+            (self.max_entries,)
+        )
+        self._conn.commit()
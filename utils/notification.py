@@ -1,12 +1,33 @@
+import base64
 import smtplib
 import ssl
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from email.mime.application import MIMEApplication
 import os
+from contextlib import contextmanager
+from functools import lru_cache
 from typing import Optional, List
 from datetime import datetime
 
+@lru_cache(maxsize=4)
+def _encoded_attachment(path: str, mtime_ns: int, size: int) -> str:
+    """Base64 text of an attachment, read and encoded once per file version"""
+    with open(path, "rb") as attachment:
+        return base64.encodebytes(attachment.read()).decode("ascii")
+
+def _mark_base64(part):
+    """MIME encoder for a payload that is already base64 text"""
+    part['Content-Transfer-Encoding'] = 'base64'
+
+def _pdf_attachment(path: str) -> MIMEApplication:
+    """Build a fresh MIME part for the intake PDF from the cached encoded bytes"""
+    stat = os.stat(path)
+    encoded = _encoded_attachment(os.path.abspath(path), stat.st_mtime_ns, stat.st_size)
+    part = MIMEApplication(encoded, _encoder=_mark_base64, Name="New-Patient-Intake-Form.pdf")
+    part['Content-Disposition'] = f'attachment; filename="New-Patient-Intake-Form.pdf"'
+    return part
+
 class MockNotificationService:
     """Mock notification service for testing with fake data"""
     
@@ -20,6 +41,26 @@ class MockNotificationService:
         self.smtp_port = int(os.getenv("SMTP_PORT", "587"))
         self.email_user = os.getenv("EMAIL_USER")
         self.email_password = os.getenv("EMAIL_PASSWORD")
+        
+        # Open SMTP connection shared by sends inside session()
+        self._smtp = None
+    
+    @contextmanager
+    def session(self):
+        """Keep one authenticated SMTP connection open for several real sends"""
+        if self.mock_mode or self._smtp is not None:
+            yield self
+            return
+        
+        context = ssl.create_default_context()
+        with smtplib.SMTP(self.smtp_server, self.smtp_port) as server:
+            server.starttls(context=context)
+            server.login(self.email_user, self.email_password)
+            self._smtp = server
+            try:
+                yield self
+            finally:
+                self._smtp = None
     
     def send_email_reminder(self, 
                            patient_email: str, 
@@ -176,10 +217,8 @@ Medical Practice Team
             
             # Attach PDF file
             if os.path.exists(form_path):
-                with open(form_path, "rb") as attachment:
-                    part = MIMEApplication(attachment.read(), Name="New-Patient-Intake-Form.pdf")
-                    part['Content-Disposition'] = f'attachment; filename="New-Patient-Intake-Form.pdf"'
-                    msg.attach(part)
+                # Encoded bytes are reused until the PDF changes on disk; each message gets its own part
+                msg.attach(_pdf_attachment(form_path))
                 print(f" PDF attachment added: {form_path}")
             else:
                 print(f" Warning: Intake form not found at {form_path}")
@@ -195,13 +234,17 @@ Medical Practice Team
     def _send_real_email_smtp(self, msg: MIMEMultipart, to_email: str) -> bool:
         """Send email using SMTP"""
         try:
-            # Create secure connection
-            context = ssl.create_default_context()
-            
-            with smtplib.SMTP(self.smtp_server, self.smtp_port) as server:
-                server.starttls(context=context)
-                server.login(self.email_user, self.email_password)
-                server.send_message(msg)
+            if self._smtp is not None:
+                # Reuse the connection opened by session()
+                self._smtp.send_message(msg)
+            else:
+                # Create secure connection
+                context = ssl.create_default_context()
+                
+                with smtplib.SMTP(self.smtp_server, self.smtp_port) as server:
+                    server.starttls(context=context)
+                    server.login(self.email_user, self.email_password)
+                    server.send_message(msg)
             
             print(f" Email with PDF attachment sent successfully to {to_email}")
             return True